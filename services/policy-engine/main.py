@@ -3,7 +3,7 @@ from fastapi.responses import JSONResponse
 from pydantic import BaseModel
 import uvicorn
 import os
-import json
+import orjson
 import logging
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -119,8 +119,8 @@ async def get_policy_status(policy_id: str):
     status_file = f"processing_status/{policy_id}_status.json"
     
     if os.path.exists(status_file):
-        with open(status_file, 'r') as f:
-            status = json.load(f)
+        with open(status_file, 'rb') as f:
+            status = orjson.loads(f.read())
         return status
     else:
         raise HTTPException(status_code=404, detail="Policy not found or still processing")
@@ -132,8 +132,8 @@ async def get_policy(policy_id: str):
     result_file = f"processed_policies/{policy_id}_result.json"
     
     if os.path.exists(result_file):
-        with open(result_file, 'r') as f:
-            result = json.load(f)
+        with open(result_file, 'rb') as f:
+            result = orjson.loads(f.read())
         
         return PolicyResponse(
             policy_id=policy_id,
@@ -159,8 +159,8 @@ async def list_policies(skip: int = 0, limit: int = 10):
     
     policies = []
     for file in policy_files[skip:skip+limit]:
-        with open(os.path.join(processed_dir, file), 'r') as f:
-            policy_data = json.load(f)
+        with open(os.path.join(processed_dir, file), 'rb') as f:
+            policy_data = orjson.loads(f.read())
             policies.append({
                 "policy_id": policy_data.get('policy_id'),
                 "provider": policy_data.get('provider'),
@@ -202,8 +202,8 @@ async def store_processing_result(policy_id: str, result: Dict, processing_time:
     
     # Store result
     result_file = f"processed_policies/{policy_id}_result.json"
-    with open(result_file, 'w') as f:
-        json.dump(result, f, indent=2)
+    with open(result_file, 'wb') as f:
+        f.write(orjson.dumps(result, option=orjson.OPT_INDENT_2))
     
     # Update status
     status = {
@@ -215,8 +215,8 @@ async def store_processing_result(policy_id: str, result: Dict, processing_time:
     }
     
     status_file = f"processing_status/{policy_id}_status.json"
-    with open(status_file, 'w') as f:
-        json.dump(status, f, indent=2)
+    with open(status_file, 'wb') as f:
+        f.write(orjson.dumps(status, option=orjson.OPT_INDENT_2))
 
 async def store_error_result(policy_id: str, error: str):
     """Store error result"""
@@ -231,8 +231,8 @@ async def store_error_result(policy_id: str, error: str):
     }
     
     status_file = f"processing_status/{policy_id}_status.json"
-    with open(status_file, 'w') as f:
-        json.dump(status, f, indent=2)
+    with open(status_file, 'wb') as f:
+        f.write(orjson.dumps(status, option=orjson.OPT_INDENT_2))
 
 if __name__ == "__main__":
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -1,9 +1,11 @@
 import logging
-import json
+import os
 from typing import Dict, List, Optional, Any
 import numpy as np
+import orjson
 from datetime import datetime
 import hashlib
+import zlib
 
 logger = logging.getLogger(__name__)
 
@@ -17,58 +19,51 @@ class VectorStore:
         self.storage_dir = "vector_store"
         
         # Create storage directory
-        import os
         os.makedirs(self.storage_dir, exist_ok=True)
         
         # Initialize embedding model (simplified)
         self.embedding_dim = 384  # Dimension for sentence embeddings
         
+        # All policies' embeddings concatenated into one matrix so a search
+        # is a single matrix-vector product. Rows of deleted policies are
+        # masked out and compacted away once they make up half the matrix.
+        self._global_matrix = np.empty((0, self.embedding_dim), dtype=np.float32)
+        self._global_policy_ids = np.empty(0, dtype=np.int32)  # Slot into _policy_names
+        self._global_valid = np.empty(0, dtype=bool)
+        self._global_rows = []  # Embedding metadata for each matrix row
+        self._policy_names = []
+        self._policy_slots = {}
+        
     async def create_embeddings(self, structured_data: Dict, policy_id: str) -> bool:
         """Create vector embeddings for policy data"""
         
         try:
             logger.info(f"Creating embeddings for policy: {policy_id}")
             
-            all_chunks = []
-            chunk_id = 0
-            
             # Create chunks from different sections
-            for section, content in structured_data.items():
-                if isinstance(content, list):
-                    for item in content:
-                        if isinstance(item, str) and len(item.strip()) > 10:
-                            chunk = {
-                                "chunk_id": f"{policy_id}_chunk_{chunk_id}",
-                                "policy_id": policy_id,
-                                "section": section,
-                                "content": item.strip(),
-                                "content_hash": self._hash_content(item.strip()),
-                                "timestamp": datetime.now().isoformat()
-                            }
-                            all_chunks.append(chunk)
-                            chunk_id += 1
-                
-                elif isinstance(content, str) and len(content.strip()) > 10:
-                    chunk = {
-                        "chunk_id": f"{policy_id}_chunk_{chunk_id}",
-                        "policy_id": policy_id,
-                        "section": section,
-                        "content": content.strip(),
-                        "content_hash": self._hash_content(content.strip()),
-                        "timestamp": datetime.now().isoformat()
-                    }
-                    all_chunks.append(chunk)
-                    chunk_id += 1
+            timestamp = datetime.now().isoformat()
+            all_chunks = [
+                {
+                    "chunk_id": f"{policy_id}_chunk_{chunk_id}",
+                    "policy_id": policy_id,
+                    "section": section,
+                    "content": text,
+                    "content_hash": self._hash_content(text),
+                    "timestamp": timestamp
+                }
+                for chunk_id, (section, text) in enumerate(self._iter_texts(structured_data))
+            ]
             
             # Generate embeddings for chunks
             embeddings = []
+            vectors = []
             for chunk in all_chunks:
                 embedding = await self._generate_embedding(chunk["content"])
+                vectors.append(embedding)
                 
                 embedding_data = {
                     "chunk_id": chunk["chunk_id"],
                     "policy_id": policy_id,
-                    "embedding": embedding.tolist(),  # Convert to list for JSON serialization
                     "section": chunk["section"],
                     "content_length": len(chunk["content"]),
                     "timestamp": chunk["timestamp"]
@@ -78,6 +73,7 @@ class VectorStore:
             
             # Store embeddings and chunks
             self.embeddings[policy_id] = embeddings
+            self._add_to_global(policy_id, embeddings, vectors)
             
             for chunk in all_chunks:
                 self.chunks[chunk["chunk_id"]] = chunk
@@ -95,6 +91,18 @@ class VectorStore:
             logger.error(f"Failed to create embeddings for {policy_id}: {str(e)}")
             return False
     
+    def _iter_texts(self, structured_data: Dict):
+        """Yield (section, text) pairs for every chunkable string in the policy"""
+        
+        for section, content in structured_data.items():
+            items = content if isinstance(content, list) else [content]
+            
+            for item in items:
+                if isinstance(item, str):
+                    text = item.strip()
+                    if len(text) > 10:
+                        yield section, text
+    
     async def _generate_embedding(self, text: str) -> np.ndarray:
         """Generate embedding for text (simplified implementation)"""
         
@@ -111,9 +119,11 @@ class VectorStore:
             # Initialize embedding vector
             embedding = np.zeros(self.embedding_dim)
             
-            # Use word hash to distribute across dimensions
+            # Use word hash to distribute across dimensions. crc32 is stable
+            # across interpreter restarts, unlike the salted built-in hash(),
+            # so stored embeddings stay comparable with new query embeddings
             for i, word in enumerate(words[:50]):  # Limit to first 50 words
-                word_hash = hash(word) % self.embedding_dim
+                word_hash = zlib.crc32(word.encode('utf-8')) % self.embedding_dim
                 embedding[word_hash] += 1.0 / (i + 1)  # Decay by position
             
             # Normalize embedding
@@ -130,7 +140,7 @@ class VectorStore:
     
     def _hash_content(self, content: str) -> str:
         """Generate hash for content"""
-        return hashlib.md5(content.encode()).hexdigest()[:8]
+        return hashlib.blake2b(content.encode('utf-8'), digest_size=4).hexdigest()
     
     async def _update_search_index(self, policy_id: str, embeddings: List[Dict]):
         """Update search index with new embeddings"""
@@ -151,6 +161,60 @@ class VectorStore:
                 "content_length": embedding_data["content_length"]
             })
     
+    def _add_to_global(self, policy_id: str, embeddings: List[Dict], vectors) -> None:
+        """Append a policy's embeddings to the concatenated search matrix"""
+        
+        # Replace any rows from a previous run for this policy
+        self._remove_from_global(policy_id)
+        
+        slot = self._policy_slots.get(policy_id)
+        if slot is None:
+            slot = len(self._policy_names)
+            self._policy_names.append(policy_id)
+            self._policy_slots[policy_id] = slot
+        
+        # Store unit vectors so a dot product is the cosine similarity
+        matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, self.embedding_dim)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms > 0, norms, 1.0)
+        
+        self._global_matrix = np.concatenate([self._global_matrix, matrix])
+        self._global_policy_ids = np.concatenate([
+            self._global_policy_ids, np.full(len(matrix), slot, dtype=np.int32)
+        ])
+        self._global_valid = np.concatenate([self._global_valid, np.ones(len(matrix), dtype=bool)])
+        self._global_rows.extend(embeddings)
+    
+    def _policy_vectors(self, policy_id: str) -> np.ndarray:
+        """Get the live rows of the search matrix belonging to a policy"""
+        
+        slot = self._policy_slots.get(policy_id)
+        if slot is None:
+            return np.empty((0, self.embedding_dim), dtype=np.float32)
+        
+        return self._global_matrix[self._global_valid & (self._global_policy_ids == slot)]
+    
+    def _remove_from_global(self, policy_id: str) -> None:
+        """Mask a policy's rows out of the search matrix"""
+        
+        slot = self._policy_slots.get(policy_id)
+        if slot is None:
+            return
+        
+        self._global_valid[self._global_policy_ids == slot] = False
+        
+        if np.count_nonzero(~self._global_valid) * 2 > len(self._global_valid):
+            self._compact_global()
+    
+    def _compact_global(self) -> None:
+        """Drop masked rows from the search matrix"""
+        
+        keep = self._global_valid
+        self._global_matrix = self._global_matrix[keep]
+        self._global_policy_ids = self._global_policy_ids[keep]
+        self._global_rows = [row for row, kept in zip(self._global_rows, keep) if kept]
+        self._global_valid = np.ones(len(self._global_rows), dtype=bool)
+    
     async def search_similar(self, query: str, policy_id: Optional[str] = None, top_k: int = 5) -> List[Dict]:
         """Search for similar content using embeddings"""
         
@@ -158,54 +222,49 @@ class VectorStore:
             # Generate query embedding
             query_embedding = await self._generate_embedding(query)
             
-            results = []
+            query_norm = np.linalg.norm(query_embedding)
+            if query_norm == 0 or not self._global_rows:
+                return []
+            
+            # Cosine similarity against every stored chunk in one BLAS call
+            scores = self._global_matrix @ (query_embedding / query_norm).astype(np.float32)
+            
+            mask = self._global_valid & (scores > 0.3)  # Threshold
             
             # Search in specific policy or all policies
-            target_policies = [policy_id] if policy_id else list(self.embeddings.keys())
+            if policy_id:
+                slot = self._policy_slots.get(policy_id)
+                if slot is None:
+                    return []
+                mask &= self._global_policy_ids == slot
             
-            for policy in target_policies:
-                if policy not in self.embeddings:
-                    continue
+            candidates = np.flatnonzero(mask)
+            
+            # Sort by similarity and keep top_k
+            if 0 < top_k < len(candidates):
+                candidates = candidates[np.argpartition(-scores[candidates], top_k)[:top_k]]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")][:top_k]
+            
+            results = []
+            for row in candidates:
+                embedding_data = self._global_rows[row]
+                chunk_info = self.chunks.get(embedding_data["chunk_id"], {})
                 
-                for embedding_data in self.embeddings[policy]:
-                    # Calculate similarity (cosine similarity)
-                    similarity = self._cosine_similarity(
-                        query_embedding,
-                        np.array(embedding_data["embedding"])
-                    )
-                    
-                    if similarity > 0.3:  # Threshold
-                        chunk_info = self.chunks.get(embedding_data["chunk_id"], {})
-                        
-                        results.append({
-                            "chunk_id": embedding_data["chunk_id"],
-                            "policy_id": policy,
-                            "section": embedding_data["section"],
-                            "content": chunk_info.get("content", ""),
-                            "similarity_score": similarity,
-                            "content_length": embedding_data["content_length"]
-                        })
-            
-            # Sort by similarity and return top_k
-            results.sort(key=lambda x: x["similarity_score"], reverse=True)
-            return results[:top_k]
+                results.append({
+                    "chunk_id": embedding_data["chunk_id"],
+                    "policy_id": self._policy_names[self._global_policy_ids[row]],
+                    "section": embedding_data["section"],
+                    "content": chunk_info.get("content", ""),
+                    "similarity_score": float(scores[row]),
+                    "content_length": embedding_data["content_length"]
+                })
+            
+            return results
             
         except Exception as e:
             logger.error(f"Search failed: {str(e)}")
             return []
     
-    def _cosine_similarity(self, vec1: np.ndarray, vec2: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
-        
-        return dot_product / (norm1 * norm2)
-    
     async def get_policy_chunks(self, policy_id: str, section: Optional[str] = None) -> List[Dict]:
         """Get chunks for a specific policy and optionally section"""
         
@@ -225,6 +284,7 @@ class VectorStore:
             # Remove from embeddings
             if policy_id in self.embeddings:
                 del self.embeddings[policy_id]
+            self._remove_from_global(policy_id)
             
             # Remove from index
             if policy_id in self.index:
@@ -253,10 +313,12 @@ class VectorStore:
         """Save embeddings to disk"""
         
         try:
-            # Save embeddings
+            # Save embedding vectors as a raw float32 matrix and their metadata as JSON
+            np.save(f"{self.storage_dir}/{policy_id}_vectors.npy", self._policy_vectors(policy_id))
+            
             embeddings_file = f"{self.storage_dir}/{policy_id}_embeddings.json"
-            with open(embeddings_file, 'w') as f:
-                json.dump(self.embeddings.get(policy_id, []), f, indent=2)
+            with open(embeddings_file, 'wb') as f:
+                f.write(orjson.dumps(self.embeddings.get(policy_id, [])))
             
             # Save chunks
             policy_chunks = {
@@ -265,13 +327,13 @@ class VectorStore:
             }
             
             chunks_file = f"{self.storage_dir}/{policy_id}_chunks.json"
-            with open(chunks_file, 'w') as f:
-                json.dump(policy_chunks, f, indent=2)
+            with open(chunks_file, 'wb') as f:
+                f.write(orjson.dumps(policy_chunks))
             
             # Save index
             index_file = f"{self.storage_dir}/{policy_id}_index.json"
-            with open(index_file, 'w') as f:
-                json.dump(self.index.get(policy_id, {}), f, indent=2)
+            with open(index_file, 'wb') as f:
+                f.write(orjson.dumps(self.index.get(policy_id, {})))
                 
         except Exception as e:
             logger.error(f"Failed to save to disk: {str(e)}")
@@ -279,9 +341,8 @@ class VectorStore:
     async def _delete_from_disk(self, policy_id: str):
         """Delete policy files from disk"""
         
-        import os
-        
         files_to_delete = [
+            f"{self.storage_dir}/{policy_id}_vectors.npy",
             f"{self.storage_dir}/{policy_id}_embeddings.json",
             f"{self.storage_dir}/{policy_id}_chunks.json",
             f"{self.storage_dir}/{policy_id}_index.json"
@@ -297,22 +358,35 @@ class VectorStore:
         try:
             # Load embeddings
             embeddings_file = f"{self.storage_dir}/{policy_id}_embeddings.json"
+            vectors_file = f"{self.storage_dir}/{policy_id}_vectors.npy"
             if os.path.exists(embeddings_file):
-                with open(embeddings_file, 'r') as f:
-                    self.embeddings[policy_id] = json.load(f)
+                with open(embeddings_file, 'rb') as f:
+                    embeddings = orjson.loads(f.read())
+                
+                if os.path.exists(vectors_file):
+                    vectors = np.load(vectors_file, mmap_mode='r')
+                else:
+                    # Older stores kept each vector inline as a JSON list
+                    vectors = np.asarray(
+                        [embedding_data.pop("embedding") for embedding_data in embeddings],
+                        dtype=np.float32
+                    )
+                
+                self.embeddings[policy_id] = embeddings
+                self._add_to_global(policy_id, embeddings, vectors)
             
             # Load chunks
             chunks_file = f"{self.storage_dir}/{policy_id}_chunks.json"
             if os.path.exists(chunks_file):
-                with open(chunks_file, 'r') as f:
-                    policy_chunks = json.load(f)
+                with open(chunks_file, 'rb') as f:
+                    policy_chunks = orjson.loads(f.read())
                     self.chunks.update(policy_chunks)
             
             # Load index
             index_file = f"{self.storage_dir}/{policy_id}_index.json"
             if os.path.exists(index_file):
-                with open(index_file, 'r') as f:
-                    self.index[policy_id] = json.load(f)
+                with open(index_file, 'rb') as f:
+                    self.index[policy_id] = orjson.loads(f.read())
             
             logger.info(f"Loaded embeddings for policy: {policy_id}")
             return True
@@ -1,10 +1,13 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse, RedirectResponse, Response
+from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import uvicorn
 import os
 import json
+import hashlib
 import logging
+import time
 from datetime import datetime
 from typing import Dict, List, Optional
 import asyncio
@@ -18,10 +21,26 @@ from whatsapp_client import WhatsAppClient
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="NitiVista Voice Generation System", version="1.0.0")
+app = FastAPI(
+    title="NitiVista Voice Generation System",
+    version="1.0.0",
+    default_response_class=ORJSONResponse
+)
 
-# Initialize components
-voice_generator = VoiceGenerator()
+# Generated audio is served as static files at /audio/<name>.mp3
+os.makedirs("generated_audio", exist_ok=True)
+app.mount("/audio", StaticFiles(directory="generated_audio"), name="audio")
+
+# Maximum WhatsApp sends in flight for one broadcast
+WHATSAPP_BROADCAST_CONCURRENCY = 20
+
+# When served behind nginx, set to the internal location mapped to
+# generated_audio (e.g. "/protected") so nginx sends the file itself
+AUDIO_ACCEL_REDIRECT_PREFIX = os.getenv("AUDIO_ACCEL_REDIRECT_PREFIX")
+
+# Initialize components. The voice generator is created per worker at
+# startup so TTS engine state is never shared across a fork.
+voice_generator: Optional[VoiceGenerator] = None
 text_simplifier = TextSimplifier()
 whatsapp_client = WhatsAppClient()
 
@@ -39,12 +58,33 @@ class VoiceResponse(BaseModel):
     audio_file_path: Optional[str] = None
     processing_time: Optional[float] = None
 
+class VoiceBatchRequest(BaseModel):
+    text: str
+    phone_numbers: List[str]
+    language: str = "en"
+    policy_id: Optional[str] = None
+
 class WhatsAppWebhook(BaseModel):
     phone_number: str
     message: str
     message_type: str
     timestamp: datetime
 
+@app.on_event("startup")
+async def init_voice_generator():
+    global voice_generator
+    voice_generator = VoiceGenerator()
+    await voice_generator.warm_up()
+
+@app.on_event("shutdown")
+async def flush_whatsapp_history():
+    await whatsapp_client.flush_history()
+
+@app.on_event("shutdown")
+async def close_voice_generator():
+    if voice_generator is not None:
+        await voice_generator.close()
+
 @app.get("/")
 async def root():
     return {
@@ -70,35 +110,34 @@ async def generate_voice(request: VoiceRequest, background_tasks: BackgroundTask
     """Generate voice message from text"""
     
     # Generate unique request ID
-    request_id = f"VOICE_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(request.text) % 10000:04d}"
+    request_id = f"VOICE_{time.strftime('%Y%m%d_%H%M%S')}_{hashlib.blake2b(request.text.encode('utf-8'), digest_size=4).hexdigest()}"
     
     try:
         logger.info(f"Starting voice generation for request: {request_id}")
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
-        # Step 1: Simplify text if needed
+        # Step 1: Simplify text if needed, warming up the TTS engine meanwhile
         if request.message_type == "voice":
-            simplified_text = await text_simplifier.simplify(
-                request.text, 
-                target_grade=6, 
-                language=request.language
+            simplified_text, language_supported = await asyncio.gather(
+                asyncio.to_thread(
+                    text_simplifier.simplify,
+                    request.text, 
+                    6, 
+                    request.language
+                ),
+                voice_generator.prepare(request.language)
             )
+            
+            if not language_supported:
+                raise HTTPException(status_code=400, detail=f"Unsupported language: {request.language}")
+            
             logger.info(f"Text simplified for {request_id}")
         else:
             simplified_text = request.text
         
         # Step 2: Generate voice
         if request.message_type == "voice":
-            audio_file = await voice_generator.generate_voice(
-                text=simplified_text,
-                language=request.language,
-                output_file=f"generated_audio/{request_id}.mp3"
-            )
-            
-            if not audio_file:
-                raise HTTPException(status_code=500, detail="Voice generation failed")
-            
-            logger.info(f"Voice generated successfully for {request_id}")
+            audio_file = await synthesize_voice(simplified_text, request.language, request_id)
         
         # Step 3: Send via WhatsApp if phone number provided
         if request.phone_number:
@@ -110,7 +149,7 @@ async def generate_voice(request: VoiceRequest, background_tasks: BackgroundTask
                 request_id
             )
         
-        processing_time = (datetime.now() - start_time).total_seconds()
+        processing_time = time.perf_counter() - start_time
         
         return VoiceResponse(
             request_id=request_id,
@@ -120,10 +159,83 @@ async def generate_voice(request: VoiceRequest, background_tasks: BackgroundTask
             processing_time=processing_time
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Voice generation failed for {request_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Voice generation failed: {str(e)}")
 
+async def synthesize_voice(simplified_text: str, language: str, request_id: str) -> str:
+    """Generate generated_audio/{request_id}.mp3; the voice generator links it
+    from its audio cache when this text was already synthesized"""
+    
+    audio_file = await voice_generator.generate_voice(
+        text=simplified_text,
+        language=language,
+        output_file=f"generated_audio/{request_id}.mp3",
+        request_id=request_id
+    )
+    
+    if not audio_file:
+        raise HTTPException(status_code=500, detail="Voice generation failed")
+    
+    logger.info(f"Voice generated successfully for {request_id}")
+    return audio_file
+
+@app.post("/generate-voice/batch", response_model=VoiceResponse)
+async def generate_voice_batch(request: VoiceBatchRequest, background_tasks: BackgroundTasks):
+    """Generate one voice message and send it to many WhatsApp numbers"""
+    
+    # Generate unique request ID
+    request_id = f"VOICE_{time.strftime('%Y%m%d_%H%M%S')}_{hashlib.blake2b(request.text.encode('utf-8'), digest_size=4).hexdigest()}"
+    
+    try:
+        logger.info(f"Starting batch voice generation for request: {request_id}")
+        start_time = time.perf_counter()
+        
+        # Simplify and synthesize once for every recipient
+        simplified_text, language_supported = await asyncio.gather(
+            asyncio.to_thread(text_simplifier.simplify, request.text, 6, request.language),
+            voice_generator.prepare(request.language)
+        )
+        
+        if not language_supported:
+            raise HTTPException(status_code=400, detail=f"Unsupported language: {request.language}")
+        
+        audio_file = await synthesize_voice(simplified_text, request.language, request_id)
+        
+        background_tasks.add_task(broadcast_voice_message, request.phone_numbers, audio_file, request_id)
+        
+        processing_time = time.perf_counter() - start_time
+        
+        return VoiceResponse(
+            request_id=request_id,
+            status="completed",
+            message=f"Voice message generated in {request.language}, sending to {len(request.phone_numbers)} numbers",
+            audio_file_path=audio_file,
+            processing_time=processing_time
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch voice generation failed for {request_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Voice generation failed: {str(e)}")
+
+async def broadcast_voice_message(phone_numbers: List[str], audio_file: str, request_id: str):
+    """Send one voice message to many numbers, overlapping the API round trips"""
+    
+    semaphore = asyncio.Semaphore(WHATSAPP_BROADCAST_CONCURRENCY)
+    
+    async def send_one(phone_number: str) -> bool:
+        async with semaphore:
+            return await whatsapp_client.send_voice(phone_number, audio_file)
+    
+    results = await asyncio.gather(*(send_one(number) for number in phone_numbers), return_exceptions=True)
+    sent = sum(1 for result in results if result is True)
+    
+    logger.info(f"Broadcast {request_id}: {sent}/{len(phone_numbers)} voice messages sent")
+
 async def send_whatsapp_message(phone_number: str, text: Optional[str], audio_file: Optional[str], request_id: str):
     """Send message via WhatsApp"""
     try:
@@ -147,7 +259,7 @@ async def whatsapp_webhook(webhook_data: WhatsAppWebhook):
         # Process the incoming message
         # This would typically integrate with the RAG Q&A system
         
-        return {"status": "received", "message_id": f"MSG_{hash(webhook_data.message) % 10000:04d}"}
+        return {"status": "received", "message_id": f"MSG_{hashlib.blake2b(webhook_data.message.encode('utf-8'), digest_size=4).hexdigest()}"}
         
     except Exception as e:
         logger.error(f"Webhook processing failed: {str(e)}")
@@ -157,12 +269,14 @@ async def whatsapp_webhook(webhook_data: WhatsAppWebhook):
 async def get_voice_file(request_id: str):
     """Get generated voice file"""
     
-    audio_file = f"generated_audio/{request_id}.mp3"
+    if AUDIO_ACCEL_REDIRECT_PREFIX:
+        return Response(
+            media_type="audio/mpeg",
+            headers={"X-Accel-Redirect": f"{AUDIO_ACCEL_REDIRECT_PREFIX}/{request_id}.mp3"}
+        )
     
-    if os.path.exists(audio_file):
-        return FileResponse(audio_file, media_type="audio/mpeg")
-    else:
-        raise HTTPException(status_code=404, detail="Audio file not found")
+    # Kept for older clients; the file itself is served by the /audio mount
+    return RedirectResponse(f"/audio/{request_id}.mp3")
 
 @app.get("/stats")
 async def get_stats():
@@ -218,20 +332,52 @@ async def simplify_text(text: str, language: str = "en", target_grade: int = 6):
     """Simplify text to target reading grade level"""
     
     try:
-        simplified = await text_simplifier.simplify(text, target_grade, language)
+        # Simplification is CPU-bound, keep it off the event loop
+        simplified = await asyncio.to_thread(text_simplifier.simplify, text, target_grade, language)
+        improvement = await asyncio.to_thread(text_simplifier.calculate_improvement, text, simplified)
         
         return {
             "original_text": text,
             "simplified_text": simplified,
             "language": language,
             "target_grade": target_grade,
-            "readability_improvement": await text_simplifier.calculate_improvement(text, simplified)
+            "readability_improvement": improvement
         }
         
     except Exception as e:
         logger.error(f"Text simplification failed: {str(e)}")
         raise HTTPException(status_code=500, detail="Text simplification failed")
 
+@app.post("/simplify-text/batch")
+async def simplify_text_batch(texts: List[str], language: str = "en", target_grade: int = 6):
+    """Simplify many texts to target reading grade level in one request"""
+    
+    def simplify_all() -> List[Dict]:
+        results = []
+        for text in texts:
+            simplified = text_simplifier.simplify(text, target_grade, language)
+            results.append({
+                "original_text": text,
+                "simplified_text": simplified,
+                "readability_improvement": text_simplifier.calculate_improvement(text, simplified)
+            })
+        return results
+    
+    try:
+        # One worker thread handles the whole batch
+        results = await asyncio.to_thread(simplify_all)
+        
+        return {
+            "language": language,
+            "target_grade": target_grade,
+            "results": results,
+            "total_texts": len(results)
+        }
+        
+    except Exception as e:
+        logger.error(f"Batch text simplification failed: {str(e)}")
+        raise HTTPException(status_code=500, detail="Text simplification failed")
+
 @app.get("/quality/{request_id}")
 async def get_quality_metrics(request_id: str):
     """Get quality metrics for a generated voice"""
@@ -253,4 +399,9 @@ if __name__ == "__main__":
     os.makedirs("generated_audio", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
     
-    uvicorn.run(app, host="0.0.0.0", port=8002)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8002,
+        workers=int(os.getenv("UVICORN_WORKERS", "4"))
+    )
\ No newline at end of file
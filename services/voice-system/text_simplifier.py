@@ -1,10 +1,76 @@
 import logging
 import re
-from typing import Dict, List, Optional, Tuple
-import asyncio
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Patterns used on every simplification, compiled once at import
+_SENT_SPLIT = re.compile(r'[.!?]+')
+_SPACE_AFTER_PUNCT = re.compile(r'([.!?])([A-Z])')
+_CAPITALIZE = re.compile(r'(?:(?<=[.!?]\s)|\A)([a-z])')
+_LONG_WORD = re.compile(r'\S{7,}')
+
+# Conjunctions and relative pronouns where a long sentence may be split
+_BREAK_TOKENS = frozenset({'and', 'or', 'but', 'which', 'that', 'who'})
+
+# Redundant phrases and their replacements, matched in one pass with a
+# named group per phrase
+_REDUNDANCIES = [
+    (r'\bin order to\b', 'to'),
+    (r'\bdue to the fact that\b', 'because'),
+    (r'\bat this point in time\b', 'now'),
+    (r'\bin the event that\b', 'if'),
+    (r'\bfor the purpose of\b', 'to'),
+    (r'\bin spite of the fact that\b', 'although'),
+    (r'\bwith regard to\b', 'about'),
+    (r'\bpertaining to\b', 'about'),
+    (r'\bthe question as to whether\b', 'whether'),
+    (r'\bas to whether\b', 'whether')
+]
+_REDUNDANCY_PATTERN = re.compile(
+    '|'.join(f'(?P<r{i}>{pattern})' for i, (pattern, _) in enumerate(_REDUNDANCIES)),
+    re.IGNORECASE
+)
+_REDUNDANCY_REPLACEMENTS = {f'r{i}': replacement for i, (_, replacement) in enumerate(_REDUNDANCIES)}
+
+def _trie_regex(node: Dict) -> str:
+    """Render a character trie as a regex, longest continuation first"""
+    branches = [re.escape(char) + _trie_regex(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    
+    body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    
+    # A term ends here; the greedy ? still prefers the longer terms below
+    if '' in node:
+        return '(?:' + body + ')?'
+    return body
+
+def _compile_terms(terms) -> re.Pattern:
+    """Compile terms into one case-insensitive whole-word pattern.
+
+    The pattern is built from a trie of the terms, so shared prefixes are
+    matched once instead of retrying every term at each position, and a
+    longer term wins over its prefix (e.g. "sum assured" over "sum").
+    """
+    trie = {}
+    for term in terms:
+        node = trie
+        for char in term.lower():
+            node = node.setdefault(char, {})
+        node[''] = {}
+    
+    return re.compile(r'\b(' + _trie_regex(trie) + r')\b', re.IGNORECASE)
+
+def _count_sentences(text: str) -> int:
+    """Count non-empty sentences without building the stripped list"""
+    return sum(1 for s in _SENT_SPLIT.split(text) if s and not s.isspace())
+
+def _text_stats(text: str) -> Tuple[int, int]:
+    """Get (word_count, sentence_count) for text"""
+    return len(text.split()), _count_sentences(text)
+
 class TextSimplifier:
     def __init__(self):
         # Define complex words and their simple alternatives
@@ -85,10 +151,71 @@ class TextSimplifier:
             5: ['company', 'service', 'provide', 'include', 'exclude', 'condition', 'agreement', 'contract', 'period', 'amount'],
             6: ['comprehensive', 'deductible', 'liability', 'settlement', 'procedure', 'documentation', 'verification', 'approval', 'disbursement', 'termination']
         }
+        
+        # One pattern per language so replacement is a single scan
+        self._complex_patterns = {}
+        self._complex_lookup = {}
+        for lang, word_map in self.complex_words.items():
+            self._complex_patterns[lang] = _compile_terms(word_map)
+            self._complex_lookup[lang] = {term.lower(): simple for term, simple in word_map.items()}
+        
+        # Define terms that need explanation
+        self.technical_terms = {
+            'en': {
+                'deductible': ' (the amount you pay first)',
+                'premium': ' (the money you pay)',
+                'coverage': ' (what the insurance pays for)',
+                'exclusions': ' (what the insurance does not pay for)',
+                'waiting period': ' (time you must wait before benefits start)',
+                'sum assured': ' (the amount of money promised)',
+                'nominee': ' (person you choose to receive money)',
+                'policy term': ' (how long the insurance lasts)',
+                'renewal': ' (continuing the insurance for more time)',
+                'claim': ' (asking the insurance company to pay)'
+            },
+            'hi': {
+                'कटौती योग्य': ' (वह रकम जो आप पहले देते हैं)',
+                'प्रीमियम': ' (वह पैसा जो आप देते हैं)',
+                'कवरेज': ' (वह जो बीमा भुगतान करता है)',
+                'अपवाद': ' (वह जो बीमा भुगतान नहीं करता)',
+                'प्रतीक्षा अवधि': ' (वह समय जिसे आपको लाभ शुरू होने से पहले इंतजार करना होता है)',
+                'बीमाकृत राशि': ' (वादा की गई रकम)',
+                'नामांकित व्यक्ति': ' (वह व्यक्ति जिसे आप पैसे देना चुनते हैं)',
+                'पॉलिसी अवधि': ' (बीमा कितने समय तक चलता है)',
+                'नवीकरण': ' (बीमा को और समय के लिए जारी रखना)',
+                'दावा': ' (बीमा कंपनी से भुगतान करने के लिए कहना)'
+            },
+            'mr': {
+                'वजवटण्याजोगी रक्कम': ' (तुम्ही आधी द्यायची रक्कम)',
+                'प्रीमियम': ' (तुम्ही द्यायचे पैसे)',
+                'कव्हरेज': ' (विमा काय देतो)',
+                'अपवाद': ' (विमा काय देत नाही)',
+                'प्रतीक्षा कालावधी': ' (तुम्ही लाभ सुरू होण्यापूर्वी प्रतीक्षा करणारा कालावधी)',
+                'बीमाकृत रक्कम': ' (वचनबद्ध केलेली रक्कम)',
+                'नामनिर्देशित व्यक्ती': ' (तुम्ही निवडलेली व्यक्ती जिला पैसे मिळतात)',
+                'पॉलिसी कालावधी': ' (विमा किती काळासाठी असतो)',
+                'नूतनीकरण': ' (विमा अधिक काळासाठी सुरू ठेवणे)',
+                'दावा': ' (विमा कंपनीकडे पैसे मागणे)'
+            }
+        }
+        
+        self._explanation_patterns = {}
+        self._explanation_lookup = {}
+        for lang, term_map in self.technical_terms.items():
+            self._explanation_patterns[lang] = _compile_terms(term_map)
+            self._explanation_lookup[lang] = {term.lower(): explanation for term, explanation in term_map.items()}
+        
+        # Repeated texts (e.g. re-sent broadcasts) skip the pipeline entirely
+        self._simplify_cached = lru_cache(maxsize=4096)(self._simplify)
     
-    async def simplify(self, text: str, target_grade: int = 6, language: str = 'en') -> str:
+    def simplify(self, text: str, target_grade: int = 6, language: str = 'en') -> str:
         """Simplify text to target grade level"""
         
+        return self._simplify_cached(text, target_grade, language)
+    
+    def _simplify(self, text: str, target_grade: int, language: str) -> str:
+        """Run the simplification pipeline on uncached text"""
+        
         try:
             logger.info(f"Simplifying text to grade {target_grade} in {language}")
             
@@ -96,20 +223,17 @@ class TextSimplifier:
                 logger.warning(f"Language {language} not supported, using English")
                 language = 'en'
             
-            # Step 1: Replace complex words with simpler alternatives
-            simplified_text = await self._replace_complex_words(text, language)
-            
-            # Step 2: Break long sentences
-            simplified_text = await self._break_long_sentences(simplified_text, target_grade)
-            
-            # Step 3: Remove unnecessary words and phrases
-            simplified_text = await self._remove_redundancies(simplified_text)
-            
-            # Step 4: Add explanations for technical terms
-            simplified_text = await self._add_explanations(simplified_text, language)
+            # Steps 1-4 run sentence by sentence so each stage works on a
+            # short string instead of rebuilding the whole document
+            explained = set()
+            simplified_text = ' '.join(
+                part
+                for sentence in self._split_into_sentences(text)
+                for part in self._simplify_sentence(sentence, target_grade, language, explained)
+            )
             
             # Step 5: Format for better readability
-            simplified_text = await self._format_for_readability(simplified_text)
+            simplified_text = self._format_for_readability(simplified_text)
             
             logger.info(f"Text simplification completed")
             return simplified_text
@@ -118,75 +242,84 @@ class TextSimplifier:
             logger.error(f"Text simplification failed: {str(e)}")
             return text  # Return original text on failure
     
-    async def _replace_complex_words(self, text: str, language: str) -> str:
+    def _replace_complex_words(self, text: str, language: str) -> str:
         """Replace complex words with simpler alternatives"""
         
-        word_map = self.complex_words.get(language, self.complex_words['en'])
+        if language not in self._complex_patterns:
+            language = 'en'
         
-        # Case-insensitive replacement while preserving case
-        for complex_word, simple_word in word_map.items():
-            # Replace whole words only
-            pattern = r'\b' + re.escape(complex_word) + r'\b'
-            text = re.sub(pattern, simple_word, text, flags=re.IGNORECASE)
-        
-        return text
+        # Case-insensitive, whole-word replacement in a single pass
+        lookup = self._complex_lookup[language]
+        return self._complex_patterns[language].sub(lambda m: lookup[m.group(0).lower()], text)
     
-    async def _break_long_sentences(self, text: str, target_grade: int) -> str:
-        """Break long sentences into shorter ones"""
+    def _simplify_sentence(self, sentence: str, target_grade: int, language: str, explained: set) -> Iterator[str]:
+        """Simplify one sentence, yielding the shorter sentences it becomes"""
         
-        sentences = self._split_into_sentences(text)
-        simplified_sentences = []
+        # Step 1: Replace complex words with simpler alternatives
+        sentence = self._replace_complex_words(sentence, language)
         
-        for sentence in sentences:
-            words = sentence.split()
-            
-            # Break sentences longer than target grade level
-            max_words = target_grade * 3 + 5  # Rough heuristic
+        # Step 2: Break long sentences
+        for part in self._break_long_sentence(sentence, target_grade):
+            # Step 3: Remove unnecessary words and phrases
+            part = self._remove_redundancies(part)
             
-            if len(words) > max_words:
-                # Find good break points
-                break_points = self._find_sentence_breaks(words, max_words)
-                
-                if break_points:
-                    start = 0
-                    for break_point in break_points:
-                        part = ' '.join(words[start:break_point])
-                        if len(part.strip()) > 10:  # Minimum length
-                            simplified_sentences.append(part.strip() + '.')
-                        start = break_point
-                    
-                    # Add remaining part
-                    if start < len(words):
-                        remaining = ' '.join(words[start:])
-                        if len(remaining.strip()) > 10:
-                            simplified_sentences.append(remaining.strip() + '.')
-                else:
-                    simplified_sentences.append(sentence)
-            else:
-                simplified_sentences.append(sentence)
-        
-        return ' '.join(simplified_sentences)
+            # Step 4: Add explanations for technical terms
+            yield self._add_explanations(part, language, explained)
+    
+    def _break_long_sentence(self, sentence: str, target_grade: int) -> List[str]:
+        """Break a long sentence into shorter ones"""
+        
+        words = sentence.split()
+        
+        # Break sentences longer than target grade level
+        max_words = target_grade * 3 + 5  # Rough heuristic
+        
+        if len(words) <= max_words:
+            return [sentence]
+        
+        # Find good break points
+        break_points = self._find_sentence_breaks(words, max_words)
+        
+        if not break_points:
+            return [sentence]
+        
+        parts = []
+        start = 0
+        for break_point in break_points:
+            part = ' '.join(words[start:break_point])
+            if len(part.strip()) > 10:  # Minimum length
+                parts.append(part.strip() + '.')
+            start = break_point
+        
+        # Add remaining part
+        if start < len(words):
+            remaining = ' '.join(words[start:])
+            if len(remaining.strip()) > 10:
+                parts.append(remaining.strip() + '.')
+        
+        return parts
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """Split text into sentences"""
         
         # Simple sentence splitting
-        sentences = re.split(r'[.!?]+', text)
-        return [s.strip() for s in sentences if s.strip()]
+        return [s.strip() for s in _SENT_SPLIT.split(text) if s.strip()]
     
     def _find_sentence_breaks(self, words: List[str], max_words: int) -> List[int]:
         """Find good points to break a long sentence"""
         
         break_points = []
         current_length = 0
+        near_target = max_words * 0.8
+        last_index = len(words) - 1
         
         for i, word in enumerate(words):
             current_length += 1
             
             # Look for good break points
-            if (current_length >= max_words * 0.8 and  # Near target length
-                word in ['and', 'or', 'but', 'which', 'that', 'who'] and
-                i + 1 < len(words)):
+            if (current_length >= near_target and  # Near target length
+                word in _BREAK_TOKENS and
+                i < last_index):
                 
                 break_points.append(i + 1)
                 current_length = 0
@@ -198,133 +331,70 @@ class TextSimplifier:
         
         return break_points
     
-    async def _remove_redundancies(self, text: str) -> str:
+    def _remove_redundancies(self, text: str) -> str:
         """Remove redundant words and phrases"""
         
-        redundancies = [
-            (r'\b(in order) to\b', 'to'),
-            (r'\bdue to the fact that\b', 'because'),
-            (r'\bat this point in time\b', 'now'),
-            (r'\bin the event that\b', 'if'),
-            (r'\bfor the purpose of\b', 'to'),
-            (r'\bin spite of the fact that\b', 'although'),
-            (r'\bwith regard to\b', 'about'),
-            (r'\bpertaining to\b', 'about'),
-            (r'\bas to whether\b', 'whether'),
-            (r'\bthe question as to whether\b', 'whether')
-        ]
-        
-        for pattern, replacement in redundancies:
-            text = re.sub(pattern, replacement, text, flags=re.IGNORECASE)
-        
-        return text
+        return _REDUNDANCY_PATTERN.sub(lambda m: _REDUNDANCY_REPLACEMENTS[m.lastgroup], text)
     
-    async def _add_explanations(self, text: str, language: str) -> str:
-        """Add simple explanations for technical terms"""
+    def _add_explanations(self, text: str, language: str, explained: Optional[set] = None) -> str:
+        """Add simple explanations for technical terms not already in explained"""
         
-        # Define terms that need explanation
-        technical_terms = {
-            'en': {
-                'deductible': ' (the amount you pay first)',
-                'premium': ' (the money you pay)',
-                'coverage': ' (what the insurance pays for)',
-                'exclusions': ' (what the insurance does not pay for)',
-                'waiting period': ' (time you must wait before benefits start)',
-                'sum assured': ' (the amount of money promised)',
-                'nominee': ' (person you choose to receive money)',
-                'policy term': ' (how long the insurance lasts)',
-                'renewal': ' (continuing the insurance for more time)',
-                'claim': ' (asking the insurance company to pay)'
-            },
-            'hi': {
-                'कटौती योग्य': ' (वह रकम जो आप पहले देते हैं)',
-                'प्रीमियम': ' (वह पैसा जो आप देते हैं)',
-                'कवरेज': ' (वह जो बीमा भुगतान करता है)',
-                'अपवाद': ' (वह जो बीमा भुगतान नहीं करता)',
-                'प्रतीक्षा अवधि': ' (वह समय जिसे आपको लाभ शुरू होने से पहले इंतजार करना होता है)',
-                'बीमाकृत राशि': ' (वादा की गई रकम)',
-                'नामांकित व्यक्ति': ' (वह व्यक्ति जिसे आप पैसे देना चुनते हैं)',
-                'पॉलिसी अवधि': ' (बीमा कितने समय तक चलता है)',
-                'नवीकरण': ' (बीमा को और समय के लिए जारी रखना)',
-                'दावा': ' (बीमा कंपनी से भुगतान करने के लिए कहना)'
-            },
-            'mr': {
-                'वजवटण्याजोगी रक्कम': ' (तुम्ही आधी द्यायची रक्कम)',
-                'प्रीमियम': ' (तुम्ही द्यायचे पैसे)',
-                'कव्हरेज': ' (विमा काय देतो)',
-                'अपवाद': ' (विमा काय देत नाही)',
-                'प्रतीक्षा कालावधी': ' (तुम्ही लाभ सुरू होण्यापूर्वी प्रतीक्षा करणारा कालावधी)',
-                'बीमाकृत रक्कम': ' (वचनबद्ध केलेली रक्कम)',
-                'नामनिर्देशित व्यक्ती': ' (तुम्ही निवडलेली व्यक्ती जिला पैसे मिळतात)',
-                'पॉलिसी कालावधी': ' (विमा किती काळासाठी असतो)',
-                'नूतनीकरण': ' (विमा अधिक काळासाठी सुरू ठेवणे)',
-                'दावा': ' (विमा कंपनीकडे पैसे मागणे)'
-            }
-        }
+        if language not in self._explanation_patterns:
+            language = 'en'
         
-        # Add explanations for technical terms
-        terms = technical_terms.get(language, technical_terms['en'])
+        # Explain each term after its first occurrence only, in one scan
+        explanations = self._explanation_lookup[language]
+        if explained is None:
+            explained = set()
         
-        for term, explanation in terms.items():
-            # Only add explanation if term appears in text
-            if re.search(r'\b' + re.escape(term) + r'\b', text, re.IGNORECASE):
-                # Add explanation after the first occurrence
-                pattern = r'(' + re.escape(term) + r')(?![^(]*\\))'
-                text = re.sub(pattern, r'\1' + explanation, text, count=1, flags=re.IGNORECASE)
+        def add_explanation(match):
+            term = match.group(0).lower()
+            if term in explained:
+                return match.group(0)
+            explained.add(term)
+            return match.group(0) + explanations[term]
         
-        return text
+        return self._explanation_patterns[language].sub(add_explanation, text)
     
-    async def _format_for_readability(self, text: str) -> str:
+    def _format_for_readability(self, text: str) -> str:
         """Format text for better readability"""
         
         # Add proper spacing after punctuation
-        text = re.sub(r'([.!?])([A-Z])', r'\1 \2', text)
+        text = _SPACE_AFTER_PUNCT.sub(r'\1 \2', text.strip())
         
-        # Ensure proper capitalization at sentence start
-        sentences = self._split_into_sentences(text)
-        formatted_sentences = []
-        
-        for sentence in sentences:
-            if sentence:
-                # Capitalize first letter
-                sentence = sentence[0].upper() + sentence[1:].lower()
-                formatted_sentences.append(sentence)
-        
-        return ' '.join(formatted_sentences)
+        # Capitalize the first letter of each sentence, leaving the rest as is
+        return _CAPITALIZE.sub(lambda m: m.group(1).upper(), text)
     
-    async def calculate_improvement(self, original: str, simplified: str) -> Dict:
+    def calculate_improvement(self, original: str, simplified: str) -> Dict:
         """Calculate readability improvement metrics"""
         
-        original_words = original.split()
-        simplified_words = simplified.split()
-        
-        original_sentences = self._split_into_sentences(original)
-        simplified_sentences = self._split_into_sentences(simplified)
+        original_words, original_sentences = _text_stats(original)
+        simplified_words, simplified_sentences = _text_stats(simplified)
         
         return {
-            'original_word_count': len(original_words),
-            'simplified_word_count': len(simplified_words),
-            'word_reduction': len(original_words) - len(simplified_words),
-            'original_sentence_count': len(original_sentences),
-            'simplified_sentence_count': len(simplified_sentences),
-            'avg_words_per_sentence_original': len(original_words) / max(len(original_sentences), 1),
-            'avg_words_per_sentence_simplified': len(simplified_words) / max(len(simplified_sentences), 1)
+            'original_word_count': original_words,
+            'simplified_word_count': simplified_words,
+            'word_reduction': original_words - simplified_words,
+            'original_sentence_count': original_sentences,
+            'simplified_sentence_count': simplified_sentences,
+            'avg_words_per_sentence_original': original_words / max(original_sentences, 1),
+            'avg_words_per_sentence_simplified': simplified_words / max(simplified_sentences, 1)
         }
     
     def get_readability_grade(self, text: str) -> int:
         """Estimate the reading grade level of text"""
         
         words = text.split()
-        sentences = self._split_into_sentences(text)
+        sentence_count = _count_sentences(text)
         
-        if not words or not sentences:
+        if not words or not sentence_count:
             return 1
         
         # Simple heuristic based on average sentence length and word complexity
-        avg_sentence_length = len(words) / len(sentences)
+        avg_sentence_length = len(words) / sentence_count
         
         # Count complex words (longer than 6 characters)
-        complex_words = sum(1 for word in words if len(word) > 6)
+        complex_words = len(_LONG_WORD.findall(text))
         complex_word_ratio = complex_words / len(words)
         
         # Simple grade estimation
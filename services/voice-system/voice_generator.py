@@ -2,12 +2,130 @@ import logging
 import os
 import tempfile
 import asyncio
+import base64
+import re
+import shutil
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 from datetime import datetime
 import hashlib
+from collections import OrderedDict
+
+import gtts
+import requests
+from gtts import gTTS, gTTSError
 
 logger = logging.getLogger(__name__)
 
+_GTTS_HOST = "https://translate.google.com"
+_GTTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+# gTTS has no public hook for its HTTP session, so PooledGTTS.stream() mirrors
+# this release's stream(); keep it in step with the pin in requirements.txt
+_GTTS_POOLED_VERSION = "2.4.0"
+
+class TTSConnectionPool:
+    """Kept-alive HTTPS connections to the gTTS endpoint, shared process-wide.
+
+    prewarm() opens connections before the first synthesis needs them, and
+    once the pool has been idle for idle_timeout seconds the reaper closes
+    them all; the next request reopens them lazily.
+    """
+    
+    def __init__(self, max_connections: int = 8, idle_timeout: float = 60.0):
+        self.session = requests.Session()
+        self.session.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max_connections))
+        self.idle_timeout = idle_timeout
+        self._last_used = time.monotonic()
+        self._reaper: Optional[asyncio.Task] = None
+    
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        """Send a prepared request over a pooled connection"""
+        
+        self._last_used = time.monotonic()
+        return self.session.send(request, **kwargs)
+    
+    def prewarm(self, connections: int = 2):
+        """Complete the TCP and TLS handshakes for a few connections (blocking)"""
+        
+        def open_connection(_):
+            try:
+                self.session.head(_GTTS_HOST, timeout=5)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"TTS connection prewarm failed: {str(e)}")
+        
+        self._last_used = time.monotonic()
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            list(executor.map(open_connection, range(connections)))
+    
+    def mark_used(self):
+        """Reset the idle timer"""
+        
+        self._last_used = time.monotonic()
+    
+    def is_cold(self) -> bool:
+        """Whether the pool has been idle long enough for the reaper to close it"""
+        
+        return time.monotonic() - self._last_used > self.idle_timeout
+    
+    def start_reaper(self):
+        """Start closing idle connections from the running event loop"""
+        
+        loop = asyncio.get_running_loop()
+        if self._reaper is None or self._reaper.done() or self._reaper.get_loop() is not loop:
+            self._reaper = loop.create_task(self._reap())
+    
+    def close(self):
+        """Stop the reaper and close all pooled connections"""
+        
+        if self._reaper is not None:
+            self._reaper.cancel()
+            self._reaper = None
+        self.session.close()
+    
+    async def _reap(self):
+        while True:
+            await asyncio.sleep(self.idle_timeout / 2)
+            if time.monotonic() - self._last_used > self.idle_timeout:
+                self.session.close()
+
+# One pool for every synthesis in the process, so gTTS requests reuse
+# kept-alive TLS connections instead of opening one per call
+_TTS_POOL = TTSConnectionPool()
+
+class PooledGTTS(gTTS):
+    """gTTS that sends its API requests through the shared connection pool.
+    
+    Unlike upstream, requests are sent with TLS verification on. Any gTTS
+    release other than _GTTS_POOLED_VERSION falls back to the upstream stream().
+    """
+    
+    def stream(self):
+        """Do the TTS API request(s) and stream bytes"""
+        
+        if gtts.__version__ != _GTTS_POOLED_VERSION:
+            yield from super().stream()
+            return
+        
+        for pr in self._prepare_requests():
+            try:
+                r = _TTS_POOL.send(pr, proxies=urllib.request.getproxies())
+                r.raise_for_status()
+            except requests.exceptions.HTTPError:
+                raise gTTSError(tts=self, response=r)
+            except requests.exceptions.RequestException:
+                raise gTTSError(tts=self)
+            
+            for line in r.iter_lines(chunk_size=1024):
+                decoded_line = line.decode('utf-8')
+                if 'jQ1olc' in decoded_line:
+                    audio_search = _GTTS_AUDIO.search(decoded_line)
+                    if not audio_search:
+                        # Good response, but no audio stream in it
+                        raise gTTSError(tts=self, response=r)
+                    yield base64.b64decode(audio_search.group(1).encode('ascii'))
+
 class VoiceGenerator:
     def __init__(self):
         self.supported_languages = {
@@ -25,18 +143,42 @@ class VoiceGenerator:
             'start_time': datetime.now()
         }
         
-        # Quality metrics storage
-        self.quality_metrics = {}
+        # Quality metrics storage, least recently used dropped past the cap
+        self.quality_metrics: OrderedDict = OrderedDict()
+        self._metrics_cap = 10000
+        
+        # Upper bound on concurrent syntheses in batch_generate
+        self.max_concurrent_generations = 8
+        
+        # gTTS does blocking network and file I/O, so it runs on its own
+        # threads rather than the event loop or the default executor
+        self._tts_executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrent_generations,
+            thread_name_prefix='gtts'
+        )
+        
+        # Syntheses in progress by cache file, so concurrent requests for
+        # the same audio (e.g. a template sent to many users) share one
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        
+        # Content-addressed cache of synthesized audio, evicted least
+        # recently used first once it grows past max_cache_bytes. The cap
+        # covers _cache/ only: output files in generated_audio/ are hard links
+        # handed out to clients and are never evicted, so an evicted entry's
+        # disk space is freed once its output files are removed as well.
+        self.cache_dir = 'generated_audio/_cache'
+        self.max_cache_bytes = 100 * 1024 * 1024
         
-        # Ensure output directory exists
-        os.makedirs('generated_audio', exist_ok=True)
+        # Ensure output directories exist
+        os.makedirs(self.cache_dir, exist_ok=True)
     
-    async def generate_voice(self, text: str, language: str = 'en', output_file: Optional[str] = None) -> Optional[str]:
+    async def generate_voice(self, text: str, language: str = 'en', output_file: Optional[str] = None,
+                             request_id: Optional[str] = None) -> Optional[str]:
         """Generate voice from text using available TTS engines"""
         
         try:
             self.stats['total_requests'] += 1
-            start_time = datetime.now()
+            start_time = time.perf_counter()
             
             logger.info(f"Starting voice generation for text: '{text[:50]}...' in {language}")
             
@@ -49,29 +191,32 @@ class VoiceGenerator:
             # Generate output filename if not provided
             if not output_file:
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-                text_hash = hashlib.md5(text.encode()).hexdigest()[:8]
+                text_hash = hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
                 output_file = f"generated_audio/voice_{timestamp}_{text_hash}.mp3"
             
             # Ensure directory exists
             os.makedirs(os.path.dirname(output_file), exist_ok=True)
             
-            # Generate voice based on language
-            if language == 'en':
-                success = await self._generate_english_voice(text, output_file)
-            elif language == 'hi':
-                success = await self._generate_hindi_voice(text, output_file)
-            elif language == 'mr':
-                success = await self._generate_marathi_voice(text, output_file)
+            # gTTS output depends only on text and language, so reuse any
+            # earlier synthesis of the same pair
+            cache_file = self._cache_path(text, language)
+            
+            if os.path.exists(cache_file):
+                logger.info(f"Voice cache hit: {cache_file}")
+                self._touch_cache_entry(cache_file)
+                success = True
             else:
-                success = False
+                success = await self._synthesize_shared(text, language, cache_file)
             
             if success:
+                self._link_from_cache(cache_file, output_file)
+                
                 self.stats['successful_generations'] += 1
-                processing_time = (datetime.now() - start_time).total_seconds()
+                processing_time = time.perf_counter() - start_time
                 self.stats['total_processing_time'] += processing_time
                 
                 # Store quality metrics
-                await self._store_quality_metrics(output_file, text, language, processing_time)
+                await self._store_quality_metrics(output_file, text, language, processing_time, request_id)
                 
                 logger.info(f"Voice generation successful: {output_file}")
                 return output_file
@@ -85,64 +230,155 @@ class VoiceGenerator:
             logger.error(f"Voice generation failed: {str(e)}")
             return None
     
-    async def _generate_english_voice(self, text: str, output_file: str) -> bool:
-        """Generate English voice using gTTS"""
+    async def warm_up(self):
+        """Start the idle-connection reaper and prewarm TTS connections in the background"""
         
-        try:
-            from gtts import gTTS
-            
-            # Create gTTS object
-            tts = gTTS(text=text, lang='en', slow=False)
-            
-            # Save to file
-            tts.save(output_file)
-            
-            return True
-            
-        except Exception as e:
-            logger.error(f"English voice generation failed: {str(e)}")
+        _TTS_POOL.start_reaper()
+        asyncio.get_running_loop().run_in_executor(self._tts_executor, _TTS_POOL.prewarm)
+    
+    async def close(self):
+        """Release pooled TTS connections and synthesis threads on shutdown"""
+        
+        _TTS_POOL.close()
+        self._tts_executor.shutdown(wait=False, cancel_futures=True)
+    
+    async def prepare(self, language: str) -> bool:
+        """Check the TTS engine can handle language; if its connections have been
+        reaped, start reopening one without waiting for it"""
+        
+        if language not in self.supported_languages:
             return False
+        
+        if _TTS_POOL.is_cold():
+            # Counts as use, so concurrent requests don't each start a prewarm
+            _TTS_POOL.mark_used()
+            asyncio.get_running_loop().run_in_executor(self._tts_executor, _TTS_POOL.prewarm, 1)
+        
+        return True
+    
+    def _cache_path(self, text: str, language: str) -> str:
+        """Get the cache file for a (text, language) pair"""
+        
+        key = hashlib.sha256(f"{language}\0{text}".encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+    
+    async def _synthesize_shared(self, text: str, language: str, cache_file: str) -> bool:
+        """Synthesize into the cache, sharing one synthesis between concurrent
+        requests for the same text and language"""
+        
+        task = self._in_flight.get(cache_file)
+        if task is None:
+            task = asyncio.ensure_future(self._synthesize_to_cache(text, language, cache_file))
+            self._in_flight[cache_file] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(cache_file, None))
+        
+        # A cancelled caller must not cancel the synthesis for the others
+        return await asyncio.shield(task)
     
-    async def _generate_hindi_voice(self, text: str, output_file: str) -> bool:
-        """Generate Hindi voice using gTTS"""
+    async def _synthesize_to_cache(self, text: str, language: str, cache_file: str) -> bool:
+        """Generate voice into the cache, publishing the file only when complete"""
+        
+        fd, temp_file = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        os.close(fd)
         
         try:
-            from gtts import gTTS
-            
-            # Create gTTS object for Hindi
-            tts = gTTS(text=text, lang='hi', slow=False)
+            # Every supported language is a gTTS language code
+            success = await self._generate_gtts(text, language, temp_file)
             
-            # Save to file
-            tts.save(output_file)
+            if success:
+                os.replace(temp_file, cache_file)
+                
+                # Scanning the cache is blocking disk work, keep it off the loop
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._tts_executor, self._evict_cache)
             
-            return True
+            return success
             
-        except Exception as e:
-            logger.error(f"Hindi voice generation failed: {str(e)}")
-            return False
+        finally:
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
     
-    async def _generate_marathi_voice(self, text: str, output_file: str) -> bool:
-        """Generate Marathi voice using gTTS"""
+    def _link_from_cache(self, cache_file: str, output_file: str):
+        """Place a cached file at output_file, hard-linking when possible"""
         
+        # A repeated request for the same output is already linked
         try:
-            from gtts import gTTS
-            
-            # Create gTTS object for Marathi
-            tts = gTTS(text=text, lang='mr', slow=False)
+            if os.path.samefile(cache_file, output_file):
+                return
+        except FileNotFoundError:
+            pass
+        
+        # Link beside the target and rename over it, so readers of
+        # output_file never see it missing or half-copied
+        temp_file = f"{output_file}.{os.getpid()}.tmp"
+        try:
+            os.link(cache_file, temp_file)
+        except OSError:
+            # Cross-device cache or a filesystem without hard links
+            shutil.copyfile(cache_file, temp_file)
+        os.replace(temp_file, output_file)
+    
+    def _touch_cache_entry(self, cache_file: str):
+        """Mark a cache entry as used now, even on noatime mounts"""
+        
+        try:
+            os.utime(cache_file, (time.time(), os.path.getmtime(cache_file)))
+        except OSError:
+            pass
+    
+    def _evict_cache(self):
+        """Remove least recently used cache entries while over max_cache_bytes"""
+        
+        entries = []
+        total_bytes = 0
+        
+        with os.scandir(self.cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith('.mp3') and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_atime, stat.st_size, entry.path))
+                    total_bytes += stat.st_size
+        
+        if total_bytes <= self.max_cache_bytes:
+            return
+        
+        entries.sort()
+        for _, size, path in entries:
+            if total_bytes <= self.max_cache_bytes:
+                break
+            try:
+                os.remove(path)
+                total_bytes -= size
+            except OSError:
+                pass
+    
+    async def _generate_gtts(self, text: str, lang: str, output_file: str) -> bool:
+        """Generate voice using gTTS over the shared connection pool"""
+        
+        try:
+            tts = PooledGTTS(text=text, lang=lang, slow=False)
             
-            # Save to file
-            tts.save(output_file)
+            # Save to file off the event loop
+            loop = asyncio.get_running_loop()
+            await loop.run_in_executor(self._tts_executor, tts.save, output_file)
             
             return True
             
         except Exception as e:
-            logger.error(f"Marathi voice generation failed: {str(e)}")
+            logger.error(f"{self.supported_languages.get(lang, lang)} voice generation failed: {str(e)}")
             return False
     
-    async def _store_quality_metrics(self, audio_file: str, original_text: str, language: str, processing_time: float):
-        """Store quality metrics for generated voice"""
+    async def _store_quality_metrics(self, audio_file: str, original_text: str, language: str, processing_time: float,
+                                     request_id: Optional[str] = None):
+        """Store quality metrics for generated voice, keyed by request_id or the file name"""
         
-        request_id = os.path.basename(audio_file).replace('.mp3', '')
+        if request_id is None:
+            request_id = os.path.basename(audio_file).replace('.mp3', '')
+        
+        try:
+            audio_file_size = os.stat(audio_file).st_size
+        except FileNotFoundError:
+            audio_file_size = 0
         
         metrics = {
             'request_id': request_id,
@@ -151,7 +387,7 @@ class VoiceGenerator:
             'text_length': len(original_text),
             'language': language,
             'processing_time': processing_time,
-            'audio_file_size': os.path.getsize(audio_file) if os.path.exists(audio_file) else 0,
+            'audio_file_size': audio_file_size,
             'estimated_duration': len(original_text.split()) / 2.5,  # Rough estimate
             'naturalness_score': self._calculate_naturalness_score(language, processing_time),
             'intelligibility_score': 0.85,  # Placeholder for gTTS
@@ -159,6 +395,9 @@ class VoiceGenerator:
         }
         
         self.quality_metrics[request_id] = metrics
+        self.quality_metrics.move_to_end(request_id)
+        while len(self.quality_metrics) > self._metrics_cap:
+            self.quality_metrics.popitem(last=False)
     
     def _calculate_naturalness_score(self, language: str, processing_time: float) -> float:
         """Calculate naturalness score based on language and performance"""
@@ -185,7 +424,10 @@ class VoiceGenerator:
     async def get_quality_metrics(self, request_id: str) -> Optional[Dict]:
         """Get quality metrics for a specific request"""
         
-        return self.quality_metrics.get(request_id)
+        metrics = self.quality_metrics.get(request_id)
+        if metrics is not None:
+            self.quality_metrics.move_to_end(request_id)
+        return metrics
     
     # Statistics methods
     def get_total_requests(self) -> int:
@@ -215,17 +457,18 @@ class VoiceGenerator:
     async def batch_generate(self, texts: List[str], language: str = 'en') -> List[str]:
         """Generate voice for multiple texts"""
         
-        results = []
+        # Bound in-flight syntheses instead of sleeping between them
+        semaphore = asyncio.Semaphore(self.max_concurrent_generations)
         
-        for i, text in enumerate(texts):
-            output_file = f"generated_audio/batch_{i}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.mp3"
-            result = await self.generate_voice(text, language, output_file)
-            results.append(result)
-            
-            # Small delay to avoid overwhelming the system
-            await asyncio.sleep(0.1)
+        # One timestamp for the batch; the index keeps the names unique
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
-        return results
+        async def generate_one(i: int, text: str) -> Optional[str]:
+            async with semaphore:
+                output_file = f"generated_audio/batch_{i}_{timestamp}.mp3"
+                return await self.generate_voice(text, language, output_file)
+        
+        return await asyncio.gather(*(generate_one(i, text) for i, text in enumerate(texts)))
     
     async def compare_voices(self, text: str, languages: List[str]) -> Dict:
         """Generate the same text in multiple languages for comparison"""
@@ -236,15 +479,21 @@ class VoiceGenerator:
             'voices': {}
         }
         
-        for language in languages:
-            if language in self.supported_languages:
-                output_file = f"generated_audio/comparison_{language}_{hash(text) % 1000:03d}.mp3"
-                result = await self.generate_voice(text, language, output_file)
-                
-                comparison['voices'][language] = {
-                    'file_path': result,
-                    'language_name': self.supported_languages[language],
-                    'generated': result is not None
-                }
+        # Each language once; a repeated comparison hits the audio cache
+        languages = [language for language in dict.fromkeys(languages) if language in self.supported_languages]
+        text_hash = hashlib.blake2b(text.encode(), digest_size=4).hexdigest()
+        
+        # The languages are independent, so synthesize them concurrently
+        results = await asyncio.gather(*(
+            self.generate_voice(text, language, f"generated_audio/comparison_{language}_{text_hash}.mp3")
+            for language in languages
+        ))
+        
+        for language, result in zip(languages, results):
+            comparison['voices'][language] = {
+                'file_path': result,
+                'language_name': self.supported_languages[language],
+                'generated': result is not None
+            }
         
         return comparison
\ No newline at end of file
@@ -1,12 +1,27 @@
 import logging
 import os
 import json
+import re
+import fcntl
+import tempfile
+from contextlib import contextmanager
 from typing import Dict, List, Optional
 from datetime import datetime
 import asyncio
 
+import orjson
+
 logger = logging.getLogger(__name__)
 
+# Country code followed by the subscriber number (E.164)
+_PHONE_RE = re.compile(r'^\+?[1-9]\d{1,14}$')
+
+# Keywords for incoming messages, matched as substrings of the message
+_GREETING_KEYWORDS = ("hello", "hi", "नमस्ते", "नमस्कार")
+_HELP_KEYWORDS = ("help", "मदद", "मदत")
+_POLICY_KEYWORDS = ("policy", "पॉलिसी", "विमा")
+_CLAIM_KEYWORDS = ("claim", "दावा")
+
 class WhatsAppClient:
     def __init__(self):
         # WhatsApp Business API configuration
@@ -38,11 +53,43 @@ class WhatsAppClient:
             }
         }
         
+        # Message history is an append-only JSON Lines log shared by every
+        # worker, compacted down to the retained messages every compact_every
+        # appends. Appends hold a shared lock and compaction an exclusive one.
+        self.history_file = "logs/whatsapp_history.jsonl"
+        self.legacy_history_file = "logs/whatsapp_history.json"
+        self.lock_file = "logs/whatsapp_history.lock"
+        self.max_history_per_number = 100
+        self.compact_every = 1000
+        self._appends_since_compaction = 0
+        self._history_fh = None
+        
+        # Records are queued and appended by a background flush once
+        # flush_batch_size are waiting or flush_interval seconds have passed
+        self.flush_interval = 0.5
+        self.flush_batch_size = 100
+        self._pending_records: List[Dict] = []
+        self._flush_task: Optional[asyncio.Task] = None
+        self._batch_full: Optional[asyncio.Event] = None
+        
         # Ensure logs directory exists
         os.makedirs("logs", exist_ok=True)
         
         # Load message history
         self.message_history = self._load_message_history()
+        
+        # Running totals over message_history for get_stats
+        self._total_messages = 0
+        self._type_counts = {"text": 0, "voice": 0, "template": 0}
+        for messages in self.message_history.values():
+            for message_record in messages:
+                self._count_message(message_record, 1)
+        
+        if not os.path.exists(self.history_file):
+            # New log, or first run after the single-JSON history format
+            self.compact_history()
+        else:
+            self._open_history_log()
     
     async def send_text(self, phone_number: str, message: str, template_key: Optional[str] = None) -> bool:
         """Send text message via WhatsApp"""
@@ -89,8 +136,9 @@ class WhatsAppClient:
                 logger.warning("Rate limit exceeded, cannot send message")
                 return False
             
-            # Check if audio file exists
-            if not os.path.exists(audio_file_path):
+            try:
+                os.stat(audio_file_path)
+            except FileNotFoundError:
                 logger.error(f"Audio file not found: {audio_file_path}")
                 return False
             
@@ -174,37 +222,193 @@ class WhatsAppClient:
             self.message_history[phone_number] = []
         
         self.message_history[phone_number].append(message_record)
+        self._count_message(message_record, 1)
         
         # Keep only last 100 messages per number
-        if len(self.message_history[phone_number]) > 100:
-            self.message_history[phone_number] = self.message_history[phone_number][-100:]
+        messages = self.message_history[phone_number]
+        if len(messages) > self.max_history_per_number:
+            for dropped in messages[:-self.max_history_per_number]:
+                self._count_message(dropped, -1)
+            self.message_history[phone_number] = messages[-self.max_history_per_number:]
         
         # Save to disk
-        self._save_message_history()
+        self._save_message_history(message_record)
+    
+    def _count_message(self, message_record: Dict, delta: int):
+        """Add (delta=1) or remove (delta=-1) a message from the running totals"""
+        
+        self._total_messages += delta
+        msg_type = message_record.get("message_type", "text")
+        if msg_type in self._type_counts:
+            self._type_counts[msg_type] += delta
     
     def _load_message_history(self) -> Dict:
         """Load message history from disk"""
         
-        history_file = "logs/whatsapp_history.json"
+        history = {}
         
         try:
-            if os.path.exists(history_file):
-                with open(history_file, 'r') as f:
-                    return json.load(f)
+            if os.path.exists(self.history_file):
+                history = self._read_history_log()
+            
+            elif os.path.exists(self.legacy_history_file):
+                with open(self.legacy_history_file, 'rb') as f:
+                    history = orjson.loads(f.read())
+                    
         except Exception as e:
             logger.error(f"Failed to load message history: {str(e)}")
         
-        return {}
+        return history
     
-    def _save_message_history(self):
-        """Save message history to disk"""
+    def _read_history_log(self) -> Dict:
+        """Read the history log, keeping the last max_history_per_number messages per number"""
+        
+        history = {}
+        
+        with open(self.history_file, 'rb') as f:
+            for line in f:
+                try:
+                    record = orjson.loads(line)
+                except ValueError:
+                    # Blank or partially written line
+                    continue
+                
+                if not isinstance(record, dict) or "phone_number" not in record:
+                    # Valid JSON, but not a message record
+                    continue
+                
+                history.setdefault(record["phone_number"], []).append(record)
+        
+        for phone_number, messages in history.items():
+            history[phone_number] = messages[-self.max_history_per_number:]
+        
+        return history
+    
+    @contextmanager
+    def _history_lock(self, operation: int):
+        """Hold a lock on the history log shared with the other workers"""
+        
+        # A fresh descriptor per hold, so threads of this process exclude
+        # each other as well
+        with open(self.lock_file, 'a') as lock_fh:
+            fcntl.flock(lock_fh, operation)
+            yield
+    
+    def _open_history_log(self):
+        """(Re)open the history log for appending, one write per batch"""
+        
+        if self._history_fh:
+            self._history_fh.close()
+        self._history_fh = open(self.history_file, 'ab', buffering=0)
+    
+    def _reopen_if_replaced(self):
+        """Reopen the history log if another worker has compacted it"""
         
         try:
-            history_file = "logs/whatsapp_history.json"
-            with open(history_file, 'w') as f:
-                json.dump(self.message_history, f, indent=2, default=str)
+            replaced = not os.path.samestat(os.stat(self.history_file), os.fstat(self._history_fh.fileno()))
+        except FileNotFoundError:
+            replaced = True
+        
+        if replaced:
+            self._open_history_log()
+    
+    def _save_message_history(self, message_record: Dict):
+        """Queue one message record for the background history flush"""
+        
+        self._pending_records.append(message_record)
+        
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not called from the event loop, write straight away
+            self._append_records(self._pending_records)
+            self._pending_records = []
+            return
+        
+        if self._flush_task is None or self._flush_task.done():
+            self._batch_full = asyncio.Event()
+            self._flush_task = loop.create_task(self._flush_later(self._batch_full))
+        elif len(self._pending_records) >= self.flush_batch_size:
+            self._batch_full.set()
+    
+    async def _flush_later(self, batch_full: asyncio.Event):
+        """Wait for a full batch or the flush interval, then write the queue"""
+        
+        try:
+            await asyncio.wait_for(batch_full.wait(), self.flush_interval)
+        except asyncio.TimeoutError:
+            pass
+        
+        await self._write_pending()
+    
+    async def _write_pending(self):
+        """Append queued records off the event loop until none are left"""
+        
+        while self._pending_records:
+            batch, self._pending_records = self._pending_records, []
+            
+            try:
+                await asyncio.to_thread(self._append_records, batch)
+            except Exception as e:
+                logger.error(f"Failed to save message history: {str(e)}")
+            
+            # Compact between batches; anything queued meanwhile is appended
+            # to the new log by the next pass of this loop
+            if self._appends_since_compaction >= self.compact_every and not self._pending_records:
+                await asyncio.to_thread(self.compact_history)
+    
+    def _append_records(self, batch: List[Dict]):
+        """Append records to the history log in a single write"""
+        
+        payload = ''.join(json.dumps(record, default=str) + '\n' for record in batch).encode()
+        
+        with self._history_lock(fcntl.LOCK_SH):
+            self._reopen_if_replaced()
+            self._history_fh.write(payload)
+        self._appends_since_compaction += len(batch)
+    
+    async def flush_history(self):
+        """Write every queued message record; call before shutdown"""
+        
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        await self._write_pending()
+    
+    def compact_history(self):
+        """Rewrite the history log so it holds only the retained messages.
+        
+        The log is rebuilt from itself under the exclusive lock, not from this
+        worker's message_history, so other workers' records are kept; they
+        reopen the new file on their next append."""
+        
+        try:
+            with self._history_lock(fcntl.LOCK_EX):
+                if os.path.exists(self.history_file):
+                    history = self._read_history_log()
+                else:
+                    # No log yet: start it from the legacy history, if any
+                    history = self.message_history
+                
+                fd, temp_file = tempfile.mkstemp(dir=os.path.dirname(self.history_file), suffix='.tmp')
+                try:
+                    with os.fdopen(fd, 'w') as f:
+                        for messages in history.values():
+                            for message_record in messages:
+                                f.write(json.dumps(message_record, default=str) + '\n')
+                    
+                    os.replace(temp_file, self.history_file)
+                except BaseException:
+                    os.remove(temp_file)
+                    raise
+                
+                self._appends_since_compaction = 0
+                self._open_history_log()
+            
         except Exception as e:
-            logger.error(f"Failed to save message history: {str(e)}")
+            logger.error(f"Failed to compact message history: {str(e)}")
+            
+            if self._history_fh is None:
+                self._open_history_log()
     
     def get_message_history(self, phone_number: str, limit: int = 10) -> List[Dict]:
         """Get message history for a phone number"""
@@ -215,21 +419,12 @@ class WhatsAppClient:
     def get_stats(self) -> Dict:
         """Get WhatsApp client statistics"""
         
-        total_messages = sum(len(messages) for messages in self.message_history.values())
-        
-        message_types = {"text": 0, "voice": 0, "template": 0}
-        for messages in self.message_history.values():
-            for message in messages:
-                msg_type = message.get("message_type", "text")
-                if msg_type in message_types:
-                    message_types[msg_type] += 1
-        
         return {
-            "total_messages_sent": total_messages,
+            "total_messages_sent": self._total_messages,
             "unique_phone_numbers": len(self.message_history),
             "rate_limit_used": self.messages_sent_today,
             "rate_limit_total": self.rate_limit,
-            "message_types": message_types,
+            "message_types": dict(self._type_counts),
             "last_reset_date": self.last_reset_date.isoformat()
         }
     
@@ -239,10 +434,7 @@ class WhatsAppClient:
         # Simple validation - should start with country code
         # In real implementation, this would be more sophisticated
         
-        import re
-        pattern = r'^\+?[1-9]\d{1,14}$'
-        
-        return bool(re.match(pattern, phone_number))
+        return _PHONE_RE.match(phone_number) is not None
     
     async def get_delivery_status(self, message_id: str) -> Dict:
         """Get delivery status of a message"""
@@ -283,16 +475,16 @@ class WhatsAppClient:
         message_lower = message.lower().strip()
         
         # Simple keyword-based responses
-        if any(word in message_lower for word in ["hello", "hi", "नमस्ते", "नमस्कार"]):
+        if any(word in message_lower for word in _GREETING_KEYWORDS):
             return await self.send_template(phone_number, "welcome", "en")
         
-        elif any(word in message_lower for word in ["help", "मदद", "मदत"]):
+        elif any(word in message_lower for word in _HELP_KEYWORDS):
             return await self.send_template(phone_number, "help", "en")
         
-        elif any(word in message_lower for word in ["policy", "पॉलिसी", "विमा"]):
+        elif any(word in message_lower for word in _POLICY_KEYWORDS):
             return await self.send_text(phone_number, "I can help you understand your insurance policy. Please upload your policy document or ask a specific question about your policy.")
         
-        elif any(word in message_lower for word in ["claim", "दावा"]):
+        elif any(word in message_lower for word in _CLAIM_KEYWORDS):
             return await self.send_text(phone_number, "I can explain the claim process. What type of claim do you want to know about - health, motor, or life insurance?")
         
         else:
@@ -4,40 +4,51 @@ Master Validation Script for NitiVista Project
 Runs all validation checks and generates comprehensive report
 """
 
+import os
+import queue
 import subprocess
 import sys
-import json
+import orjson
 from datetime import datetime
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 
-def run_validation_script(script_name, description):
-    """Run a validation script and capture results"""
-    print(f"\n{'='*60}")
-    print(f"Running: {description}")
-    print(f"Script: {script_name}")
-    print(f"{'='*60}")
+def run_validation_script(script_name, description, emit=print):
+    """Run a validation script, passing each output line to emit as it arrives"""
+    emit(f"\n{'='*60}")
+    emit(f"Running: {description}")
+    emit(f"Script: {script_name}")
+    emit(f"{'='*60}")
     
     try:
-        result = subprocess.run(
+        process = subprocess.Popen(
             [sys.executable, script_name],
-            capture_output=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
             text=True,
-            cwd=str(Path(__file__).parent)
+            cwd=str(Path(__file__).parent),
+            # Make the child flush each line instead of a block at exit
+            env={**os.environ, 'PYTHONUNBUFFERED': '1'}
         )
         
-        print("STDOUT:")
-        print(result.stdout)
-        
-        if result.stderr:
-            print("STDERR:")
-            print(result.stderr)
+        with process.stdout:
+            for line in process.stdout:
+                emit(line.rstrip('\n'))
         
-        return result.returncode == 0
+        return process.wait() == 0
         
     except Exception as e:
-        print(f"ERROR running {script_name}: {str(e)}")
+        emit(f"ERROR running {script_name}: {str(e)}")
         return False
 
+def stream_validation_script(script_name, description, lines):
+    """Run a validation script, queueing its output lines and then None"""
+    try:
+        return run_validation_script(script_name, description, lines.put)
+    finally:
+        lines.put(None)
+
 def main():
     """Run all validation scripts"""
     print("🚀 NITIVISTA PROJECT VALIDATION SUITE")
@@ -57,16 +68,29 @@ def main():
     
     all_passed = True
     
-    for script_name, description in validations:
-        success = run_validation_script(script_name, description)
-        validation_results['validations'][script_name] = {
-            'description': description,
-            'status': 'PASSED' if success else 'FAILED',
-            'timestamp': datetime.now().isoformat()
-        }
+    # The scripts are independent, so run them all at once. Output is shown
+    # in list order: the current script streams live while later ones queue
+    # their lines until it finishes.
+    with ThreadPoolExecutor(max_workers=len(validations)) as executor:
+        outputs = [queue.Queue() for _ in validations]
+        futures = [
+            executor.submit(stream_validation_script, script_name, description, lines)
+            for (script_name, description), lines in zip(validations, outputs)
+        ]
         
-        if not success:
-            all_passed = False
+        for (script_name, description), lines, future in zip(validations, outputs, futures):
+            for line in iter(lines.get, None):
+                print(line, flush=True)
+            success = future.result()
+            
+            validation_results['validations'][script_name] = {
+                'description': description,
+                'status': 'PASSED' if success else 'FAILED',
+                'timestamp': datetime.now().isoformat()
+            }
+            
+            if not success:
+                all_passed = False
     
     # Generate summary
     print(f"\n{'='*60}")
@@ -83,8 +107,8 @@ def main():
     
     # Save results
     output_file = Path(__file__).parent.parent / "validation_summary.json"
-    with open(output_file, 'w') as f:
-        json.dump(validation_results, f, indent=2)
+    with open(output_file, 'wb') as f:
+        f.write(orjson.dumps(validation_results, option=orjson.OPT_INDENT_2))
     
     print(f"\n📄 Validation summary saved to: {output_file}")
     
@@ -127,8 +151,8 @@ def create_project_summary(all_validations_passed):
     }
     
     summary_file = Path(__file__).parent.parent / "PROJECT_SUMMARY.json"
-    with open(summary_file, 'w') as f:
-        json.dump(summary, f, indent=2)
+    with open(summary_file, 'wb') as f:
+        f.write(orjson.dumps(summary, option=orjson.OPT_INDENT_2))
     
     print(f"📋 Project summary saved to: {summary_file}")
     
@@ -4,14 +4,33 @@ Performance Metrics Validation Suite
 Validates system performance claims and technical metrics
 """
 
-import json
+import orjson
+import os
 import time
 import asyncio
 import aiohttp
+import numpy as np
 from pathlib import Path
-import statistics
+
+# Simulated (type, expected accuracy) cases, built once at import
+_OCR_TEST_CASES = (
+    ('clean_pdf', 0.99),
+    ('scanned_300dpi', 0.98),
+    ('handwritten_annotation', 0.95)
+)
+_RAG_TEST_QUERIES = (
+    ('coverage', 0.90),
+    ('exclusions', 0.85),
+    ('claims', 0.88),
+    ('premium', 0.92)
+)
 
 class PerformanceValidator:
+    # Per-attempt timeout and retry policy for API probes
+    API_CALL_TIMEOUT = 10.0
+    API_CALL_RETRIES = 3
+    API_RETRY_BACKOFF = 0.2
+    
     def __init__(self):
         self.base_path = Path("/mnt/okcomputer/output")
         self.results = {
@@ -45,29 +64,58 @@ class PerformanceValidator:
         """Test API response times"""
         print("🌐 Testing API performance...")
         
+        policy, voice, rag = await asyncio.gather(
+            self.test_policy_engine_api(),
+            self.test_voice_system_api(),
+            self.test_rag_qa_api()
+        )
+        
         test_results = {
-            'policy_engine': await self.test_policy_engine_api(),
-            'voice_system': await self.test_voice_system_api(),
-            'rag_qa': await self.test_rag_qa_api()
+            'policy_engine': policy,
+            'voice_system': voice,
+            'rag_qa': rag
         }
         
         self.results['tests']['api_performance'] = test_results
         print("✅ API performance tests completed")
     
+    async def _one_call(self, semaphore, delay):
+        """Time a single simulated API call in nanoseconds"""
+        async with semaphore:
+            start_time = time.perf_counter_ns()
+            await asyncio.wait_for(asyncio.sleep(delay), timeout=self.API_CALL_TIMEOUT)
+            return time.perf_counter_ns() - start_time
+    
+    async def _timed_calls(self, semaphore, delays):
+        """Run the simulated calls concurrently and return their latencies in ms"""
+        tasks = [self._retry(self._one_call, semaphore, delay) for delay in delays]
+        elapsed_ns = np.fromiter(await asyncio.gather(*tasks), dtype=np.int64, count=len(tasks))
+        return elapsed_ns / 1e6
+    
+    async def _retry(self, call, *args):
+        """Retry a call on transient failures with exponential backoff"""
+        for attempt in range(self.API_CALL_RETRIES):
+            try:
+                return await call(*args)
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                if attempt == self.API_CALL_RETRIES - 1:
+                    raise
+                await asyncio.sleep(self.API_RETRY_BACKOFF * 2 ** attempt)
+    
     async def test_policy_engine_api(self):
         """Test Policy Processing Engine API"""
         try:
             # Simulate API call (in real implementation, this would call actual API)
-            response_times = []
-            for i in range(10):
-                start_time = time.time()
-                # Simulate network delay
-                await asyncio.sleep(0.1 + (i * 0.05))  # Increasing delay
-                response_time = (time.time() - start_time) * 1000  # Convert to ms
-                response_times.append(response_time)
+            semaphore = asyncio.Semaphore(5)
+            # Simulate network delay, increasing per call
+            delays = 0.1 + np.arange(10) * 0.05
+            response_times = np.sort(await self._timed_calls(semaphore, delays))
             
-            avg_response_time = statistics.mean(response_times)
-            p95_response_time = statistics.quantiles(response_times, n=20)[18]  # 95th percentile
+            # Sorted once so min/max are plain index lookups
+            avg_response_time = float(response_times.mean())
+            p95_response_time = float(np.percentile(response_times, 95))
+            min_response_time = float(response_times[0])
+            max_response_time = float(response_times[-1])
             
             status = "PASSED" if avg_response_time < 2000 else "FAILED"
             
@@ -75,6 +123,8 @@ class PerformanceValidator:
                 'status': status,
                 'average_response_time_ms': avg_response_time,
                 'p95_response_time_ms': p95_response_time,
+                'min_response_time_ms': min_response_time,
+                'max_response_time_ms': max_response_time,
                 'target': '<2000ms',
                 'actual': f'{avg_response_time:.0f}ms'
             }
@@ -89,15 +139,12 @@ class PerformanceValidator:
         """Test Voice Generation System API"""
         try:
             # Simulate voice generation API
-            response_times = []
-            for i in range(5):
-                start_time = time.time()
-                # Simulate voice processing delay
-                await asyncio.sleep(1.5 + (i * 0.2))
-                response_time = (time.time() - start_time) * 1000
-                response_times.append(response_time)
+            semaphore = asyncio.Semaphore(2)
+            # Simulate voice processing delay
+            delays = 1.5 + np.arange(5) * 0.2
+            response_times = await self._timed_calls(semaphore, delays)
             
-            avg_response_time = statistics.mean(response_times)
+            avg_response_time = float(response_times.mean())
             success_rate = 0.99  # Simulated success rate
             
             status = "PASSED" if avg_response_time < 3000 and success_rate >= 0.95 else "FAILED"
@@ -122,22 +169,17 @@ class PerformanceValidator:
         """Test RAG Q&A System API"""
         try:
             # Simulate RAG Q&A processing
-            response_times = []
-            accuracies = []
+            semaphore = asyncio.Semaphore(5)
+            complexity = np.arange(20)
+            # Simulate processing delay
+            delays = 0.08 + complexity * 0.01
+            response_times = await self._timed_calls(semaphore, delays)
             
-            for i in range(20):
-                start_time = time.time()
-                # Simulate processing delay
-                await asyncio.sleep(0.08 + (i * 0.01))
-                response_time = (time.time() - start_time) * 1000
-                response_times.append(response_time)
-                
-                # Simulate accuracy (decreasing with complexity)
-                accuracy = 0.95 - (i * 0.01)
-                accuracies.append(accuracy)
+            # Simulate accuracy (decreasing with complexity)
+            accuracies = 0.95 - complexity * 0.01
             
-            avg_response_time = statistics.mean(response_times)
-            avg_accuracy = statistics.mean(accuracies)
+            avg_response_time = float(response_times.mean())
+            avg_accuracy = float(accuracies.mean())
             
             status = "PASSED" if avg_response_time < 2000 and avg_accuracy >= 0.85 else "FAILED"
             
@@ -163,19 +205,13 @@ class PerformanceValidator:
         
         try:
             # Simulate OCR accuracy testing
-            test_cases = [
-                {'type': 'clean_pdf', 'expected_accuracy': 0.99},
-                {'type': 'scanned_300dpi', 'expected_accuracy': 0.98},
-                {'type': 'handwritten_annotation', 'expected_accuracy': 0.95}
-            ]
-            
             results = {}
-            for test_case in test_cases:
+            for case_type, expected_accuracy in _OCR_TEST_CASES:
                 # Simulate accuracy measurement
-                actual_accuracy = test_case['expected_accuracy'] - 0.01  # Slightly lower in practice
+                actual_accuracy = expected_accuracy - 0.01  # Slightly lower in practice
                 
-                results[test_case['type']] = {
-                    'expected': test_case['expected_accuracy'],
+                results[case_type] = {
+                    'expected': expected_accuracy,
                     'actual': actual_accuracy,
                     'status': 'PASSED' if actual_accuracy >= 0.95 else 'FAILED'
                 }
@@ -229,28 +265,21 @@ class PerformanceValidator:
         
         try:
             # Simulate RAG accuracy testing
-            test_queries = [
-                {'type': 'coverage', 'expected_accuracy': 0.90},
-                {'type': 'exclusions', 'expected_accuracy': 0.85},
-                {'type': 'claims', 'expected_accuracy': 0.88},
-                {'type': 'premium', 'expected_accuracy': 0.92}
-            ]
-            
             results = {}
             overall_accuracy = []
             
-            for query in test_queries:
+            for query_type, expected_accuracy in _RAG_TEST_QUERIES:
                 # Simulate accuracy measurement
-                actual_accuracy = query['expected_accuracy'] - 0.02  # Real-world performance
+                actual_accuracy = expected_accuracy - 0.02  # Real-world performance
                 overall_accuracy.append(actual_accuracy)
                 
-                results[query['type']] = {
-                    'expected': query['expected_accuracy'],
+                results[query_type] = {
+                    'expected': expected_accuracy,
                     'actual': actual_accuracy,
                     'status': 'PASSED' if actual_accuracy >= 0.80 else 'FAILED'
                 }
             
-            results['overall_accuracy'] = statistics.mean(overall_accuracy)
+            results['overall_accuracy'] = float(np.mean(overall_accuracy))
             results['overall_status'] = 'PASSED' if results['overall_accuracy'] >= 0.85 else 'FAILED'
             
             self.results['tests']['rag_accuracy'] = results
@@ -259,46 +288,49 @@ class PerformanceValidator:
         except Exception as e:
             self.results['tests']['rag_accuracy'] = {'status': 'ERROR', 'error': str(e)}
     
+    def _walk_results(self, tests):
+        """Yield (category, name, status, details) for every test result"""
+        for test_category, results in tests.items():
+            if not isinstance(results, dict):
+                continue
+            if 'status' in results:
+                yield test_category, None, results['status'], results
+            else:
+                for test_name, test_result in results.items():
+                    if isinstance(test_result, dict) and 'status' in test_result:
+                        yield test_category, test_name, test_result['status'], test_result
+    
     def generate_report(self):
         """Generate comprehensive performance report"""
         print("\n📊 PERFORMANCE VALIDATION REPORT")
         print("=" * 60)
         
-        # Calculate overall status
-        failed_tests = 0
-        total_tests = 0
+        # Calculate overall status from a single walk over the results
+        results = list(self._walk_results(self.results['tests']))
+        total_tests = len(results)
+        failed_tests = sum(1 for _, _, status, _ in results if status == 'FAILED')
         
-        for test_category, results in self.results['tests'].items():
-            print(f"\n{test_category.upper()}:")
+        current_category = None
+        for test_category, test_name, status, details in results:
+            if test_category != current_category:
+                print(f"\n{test_category.upper()}:")
+                current_category = test_category
             
-            if isinstance(results, dict) and 'status' in results:
+            if test_name is None:
                 # Single test result
-                status = results['status']
-                total_tests += 1
-                if status == 'FAILED':
-                    failed_tests += 1
-                
                 print(f"  Status: {status}")
-                if 'error' in results:
-                    print(f"  Error: {results['error']}")
+                if 'error' in details:
+                    print(f"  Error: {details['error']}")
                 else:
-                    for key, value in results.items():
+                    for key, value in details.items():
                         if key != 'status':
                             print(f"  {key}: {value}")
-            
-            elif isinstance(results, dict):
-                # Multiple test results
-                for test_name, test_result in results.items():
-                    if isinstance(test_result, dict) and 'status' in test_result:
-                        status = test_result['status']
-                        total_tests += 1
-                        if status == 'FAILED':
-                            failed_tests += 1
-                        
-                        print(f"  {test_name}: {status}")
-                        for key, value in test_result.items():
-                            if key != 'status':
-                                print(f"    {key}: {value}")
+            else:
+                # One of multiple test results
+                print(f"  {test_name}: {status}")
+                for key, value in details.items():
+                    if key != 'status':
+                        print(f"    {key}: {value}")
         
         # Overall summary
         overall_status = 'PASSED' if failed_tests == 0 else 'FAILED'
@@ -319,8 +351,11 @@ class PerformanceValidator:
         print(f"  Overall Status: {overall_status}")
         
         # Save report
-        with open(self.base_path / "performance_validation_report.json", 'w') as f:
-            json.dump(self.results, f, indent=2)
+        # Unbuffered single write, synced once
+        payload = orjson.dumps(self.results, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        with open(self.base_path / "performance_validation_report.json", 'wb', buffering=0) as f:
+            f.write(payload)
+            getattr(os, 'fdatasync', os.fsync)(f.fileno())
         
         print(f"\n📄 Report saved to: {self.base_path / 'performance_validation_report.json'}")
         
@@ -342,4 +377,11 @@ if __name__ == "__main__":
         else:
             print("\n💥 Some performance validations failed!")
     
+    # uvloop trims per-task overhead for the fanned-out probes; optional
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+    
     asyncio.run(main())
\ No newline at end of file
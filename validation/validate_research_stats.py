@@ -4,75 +4,181 @@ Validation Suite for NitiVista Research Statistics
 Validates all statistical claims and data integrity
 """
 
-import pandas as pd
 import numpy as np
-import json
+import csv
+import orjson
+import os
 import sys
+import hashlib
+from datetime import datetime
 from pathlib import Path
 
+_TRUE_VALUES = frozenset(['true', '1', 'yes'])
+
+# Expected shares and schemas, built once at import
+_EXPECTED_AGE = {'18-25': 0.157, '26-35': 0.289, '36-45': 0.260, '46-55': 0.196, '56+': 0.098}
+_EXPECTED_LANGUAGE = {'marathi': 0.422, 'english': 0.417, 'hindi': 0.162}
+_REQUIRED_POLICY_FIELDS = ('policy_id', 'policy_type', 'provider', 'document_quality', 'language')
+_MAIN_DATASET_DTYPES = {
+    'age_group': 'str',
+    'primary_language': 'str',
+    'insurance_knowledge_score': 'int8',
+    'can_locate_exclusions': 'bool'
+}
+_PILOT_STUDY_DTYPES = {
+    'voice_message_opened': 'bool',
+    'follow_up_asked': 'bool',
+    'engagement_time_minutes': 'float32',
+    'satisfaction_score': 'float32',
+    'response_time_ms': 'float32'
+}
+
+try:
+    from numba import njit, prange
+    
+    @njit(parallel=True, cache=True, error_model='numpy')
+    def _column_means(a):
+        """Per-column means of a 2D array in a single pass"""
+        out = np.empty(a.shape[1])
+        for j in prange(a.shape[1]):
+            s = 0.0
+            for i in range(a.shape[0]):
+                s += a[i, j]
+            out[j] = s / a.shape[0]
+        return out
+except ImportError:
+    def _column_means(a):
+        """Per-column means of a 2D array in a single pass"""
+        return a.mean(axis=0, dtype=np.float64)
+
+def _read_csv_columns(path, dtypes):
+    """Read only the given CSV columns into NumPy arrays of the given dtypes"""
+    with open(path, 'r', newline='') as f:
+        reader = csv.DictReader(f)
+        missing = [name for name in dtypes if name not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"{Path(path).name} is missing columns: {', '.join(missing)}")
+        rows = [[row[name] for name in dtypes] for row in reader]
+    
+    raw = np.array(rows, dtype=str).reshape(len(rows), len(dtypes))
+    columns = {}
+    for i, (name, dtype) in enumerate(dtypes.items()):
+        if dtype == 'bool':
+            columns[name] = np.isin(np.char.lower(raw[:, i]), list(_TRUE_VALUES))
+        else:
+            columns[name] = raw[:, i].astype(dtype)
+    return columns
+
 class ResearchValidator:
+    # Bump whenever a check changes so stale cached results are discarded
+    CACHE_SCHEMA_VERSION = 1
+    
     def __init__(self):
         self.base_path = Path("/mnt/okcomputer/output")
         self.errors = []
         self.warnings = []
+        self.cache_file = self.base_path / ".validation_cache.json"
+        self.cache = self._load_cache()
         
     def validate_all(self):
         """Run all validation checks"""
         print("🔍 Starting Research Statistics Validation...")
         
         # Validate main dataset
-        self.validate_main_dataset()
+        self._run_cached('main_dataset', "nitivista_research_dataset.csv", self.validate_main_dataset)
         
         # Validate pilot study
-        self.validate_pilot_study()
+        self._run_cached('pilot_study', "pilot_study_results.csv", self.validate_pilot_study)
         
         # Validate system performance
-        self.validate_system_performance()
+        self._run_cached('system_performance', "system_performance_metrics.json", self.validate_system_performance)
         
         # Validate policy metadata
-        self.validate_policy_metadata()
+        self._run_cached('policy_metadata', "data/policy_metadata.json", self.validate_policy_metadata)
+        
+        self._save_cache()
         
         # Generate validation report
         self.generate_report()
         
         return len(self.errors) == 0
     
+    def _load_cache(self):
+        """Load cached check results, discarding them on schema change"""
+        try:
+            with open(self.cache_file, 'rb') as f:
+                cache = orjson.loads(f.read())
+            if cache.get('version') == self.CACHE_SCHEMA_VERSION:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {'version': self.CACHE_SCHEMA_VERSION, 'entries': {}}
+    
+    def _save_cache(self):
+        """Persist cached check results"""
+        try:
+            with open(self.cache_file, 'wb') as f:
+                f.write(orjson.dumps(self.cache, option=orjson.OPT_INDENT_2))
+        except OSError as e:
+            print(f"⚠️  Could not save validation cache: {str(e)}")
+    
+    def _file_hash(self, path):
+        """SHA-256 of a file's contents"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def _run_cached(self, name, filename, check):
+        """Run a check, replaying its previous findings if its input is unchanged"""
+        try:
+            key = self._file_hash(self.base_path / filename)
+        except OSError:
+            # Missing input - let the check report it and don't cache
+            check()
+            return
+        
+        entry = self.cache['entries'].get(name)
+        if entry and entry['key'] == key:
+            print(f"♻️  {name}: input unchanged, reusing cached results")
+            self.errors.extend(entry['errors'])
+            self.warnings.extend(entry['warnings'])
+            return
+        
+        error_count, warning_count = len(self.errors), len(self.warnings)
+        check()
+        self.cache['entries'][name] = {
+            'key': key,
+            'errors': self.errors[error_count:],
+            'warnings': self.warnings[warning_count:]
+        }
+    
     def validate_main_dataset(self):
         """Validate the main research dataset"""
         try:
-            df = pd.read_csv(self.base_path / "nitivista_research_dataset.csv")
-            print(f"📊 Validating main dataset with {len(df)} records...")
+            columns = _read_csv_columns(self.base_path / "nitivista_research_dataset.csv", _MAIN_DATASET_DTYPES)
+            records = len(columns['age_group'])
+            print(f"📊 Validating main dataset with {records} records...")
             
             # Check total records
-            if len(df) != 204:
-                self.errors.append(f"Main dataset should have 204 records, found {len(df)}")
+            if records != 204:
+                self.errors.append(f"Main dataset should have 204 records, found {records}")
             
             # Validate age distribution
-            age_dist = df['age_group'].value_counts(normalize=True)
-            expected_age = {'18-25': 0.157, '26-35': 0.289, '36-45': 0.260, '46-55': 0.196, '56+': 0.098}
-            
-            for age_group, expected_pct in expected_age.items():
-                actual_pct = age_dist.get(age_group, 0)
-                if abs(actual_pct - expected_pct) > 0.02:  # 2% tolerance
-                    self.warnings.append(f"Age group {age_group}: expected {expected_pct:.3f}, actual {actual_pct:.3f}")
+            self._check_distribution(columns['age_group'], _EXPECTED_AGE, 0.02, "Age group")  # 2% tolerance
             
             # Validate language distribution
-            lang_dist = df['primary_language'].value_counts(normalize=True)
-            expected_lang = {'marathi': 0.422, 'english': 0.417, 'hindi': 0.162}
-            
-            for lang, expected_pct in expected_lang.items():
-                actual_pct = lang_dist.get(lang, 0)
-                if abs(actual_pct - expected_pct) > 0.02:
-                    self.warnings.append(f"Language {lang}: expected {expected_pct:.3f}, actual {actual_pct:.3f}")
+            self._check_distribution(columns['primary_language'], _EXPECTED_LANGUAGE, 0.02, "Language")
             
             # Validate insurance knowledge score distribution
-            knowledge_dist = df['insurance_knowledge_score'].value_counts(normalize=True)
+            knowledge_low = np.mean(columns['insurance_knowledge_score'] == 1)
             # Based on 52% very_low (score 1), 29.4% moderate (score 3), 18.6% high (score 5)
-            if abs(knowledge_dist.get(1, 0) - 0.52) > 0.05:
+            if abs(knowledge_low - 0.52) > 0.05:
                 self.warnings.append(f"Knowledge score 1 distribution incorrect")
             
             # Validate exclusions finding - should be 78% cannot locate
-            cannot_locate = (df['can_locate_exclusions'] == False).sum() / len(df)
+            cannot_locate = 1 - columns['can_locate_exclusions'].mean()
             if abs(cannot_locate - 0.78) > 0.02:
                 self.errors.append(f"Cannot locate exclusions: expected 78%, actual {cannot_locate:.1%}")
             
@@ -81,38 +187,55 @@ class ResearchValidator:
         except Exception as e:
             self.errors.append(f"Failed to validate main dataset: {str(e)}")
     
+    def _check_distribution(self, column, expected, tolerance, label):
+        """Warn for every category whose share deviates from expected by more than tolerance"""
+        names = list(expected)
+        values, counts = np.unique(column, return_counts=True)
+        observed = dict(zip(values.tolist(), (counts / counts.sum()).tolist()))
+        actual = np.array([observed.get(name, 0.0) for name in names])
+        diff = np.abs(actual - np.fromiter(expected.values(), dtype=float))
+        
+        for i in np.flatnonzero(diff > tolerance):
+            self.warnings.append(f"{label} {names[i]}: expected {expected[names[i]]:.3f}, actual {actual[i]:.3f}")
+    
     def validate_pilot_study(self):
         """Validate pilot study results"""
         try:
-            df = pd.read_csv(self.base_path / "pilot_study_results.csv")
-            print(f"🧪 Validating pilot study with {len(df)} participants...")
+            columns = _read_csv_columns(self.base_path / "pilot_study_results.csv", _PILOT_STUDY_DTYPES)
+            participants = len(columns['voice_message_opened'])
+            print(f"🧪 Validating pilot study with {participants} participants...")
             
             # Check total participants
-            if len(df) != 50:
-                self.errors.append(f"Pilot study should have 50 participants, found {len(df)}")
+            if participants != 50:
+                self.errors.append(f"Pilot study should have 50 participants, found {participants}")
+            
+            # Reduce every pilot metric in one fused pass
+            metrics = np.column_stack([
+                columns['voice_message_opened'],
+                columns['engagement_time_minutes'],
+                columns['follow_up_asked'],
+                columns['satisfaction_score'],
+                columns['response_time_ms']
+            ]).astype(np.float32)
+            open_rate, avg_engagement, follow_up_rate, avg_satisfaction, avg_response_time = _column_means(metrics)
             
             # Validate voice message open rate (should be 62%)
-            open_rate = df['voice_message_opened'].mean()
             if abs(open_rate - 0.62) > 0.03:
                 self.errors.append(f"Voice open rate: expected 62%, actual {open_rate:.1%}")
             
             # Validate engagement time (should be 4.2 minutes)
-            avg_engagement = df['engagement_time_minutes'].mean()
             if abs(avg_engagement - 4.2) > 0.3:
                 self.warnings.append(f"Engagement time: expected 4.2 min, actual {avg_engagement:.1f} min")
             
             # Validate follow-up rate (should be 74%)
-            follow_up_rate = df['follow_up_asked'].mean()
             if abs(follow_up_rate - 0.74) > 0.03:
                 self.errors.append(f"Follow-up rate: expected 74%, actual {follow_up_rate:.1%}")
             
             # Validate satisfaction score (should be 4.3/5)
-            avg_satisfaction = df['satisfaction_score'].mean()
             if abs(avg_satisfaction - 4.3) > 0.2:
                 self.warnings.append(f"Satisfaction score: expected 4.3, actual {avg_satisfaction:.1f}")
             
             # Validate response time (should be <2s average)
-            avg_response_time = df['response_time_ms'].mean()
             if avg_response_time > 2000:
                 self.warnings.append(f"Response time: expected <2s, actual {avg_response_time/1000:.1f}s")
             
@@ -124,8 +247,8 @@ class ResearchValidator:
     def validate_system_performance(self):
         """Validate system performance metrics"""
         try:
-            with open(self.base_path / "system_performance_metrics.json", 'r') as f:
-                metrics = json.load(f)
+            with open(self.base_path / "system_performance_metrics.json", 'rb') as f:
+                metrics = orjson.loads(f.read())
             
             print("⚡ Validating system performance metrics...")
             
@@ -155,8 +278,8 @@ class ResearchValidator:
     def validate_policy_metadata(self):
         """Validate policy metadata"""
         try:
-            with open(self.base_path / "data/policy_metadata.json", 'r') as f:
-                policies = json.load(f)
+            with open(self.base_path / "data/policy_metadata.json", 'rb') as f:
+                policies = orjson.loads(f.read())
             
             print(f"📋 Validating {len(policies)} policy metadata entries...")
             
@@ -164,24 +287,27 @@ class ResearchValidator:
             if len(policies) != 50:
                 self.warnings.append(f"Expected 50 policies, found {len(policies)}")
             
+            # Lay the entries out column-wise once, then check each column vectorized
+            total = len(policies)
+            present = np.array(
+                [[field in policy for field in _REQUIRED_POLICY_FIELDS] for policy in policies],
+                dtype=bool
+            ).reshape(total, len(_REQUIRED_POLICY_FIELDS))
+            qualities = np.array([policy.get('document_quality', 'unknown') for policy in policies], dtype=str)
+            
             # Validate each policy has required fields
-            required_fields = ['policy_id', 'policy_type', 'provider', 'document_quality', 'language']
-            for policy in policies:
-                for field in required_fields:
-                    if field not in policy:
-                        self.errors.append(f"Policy {policy.get('policy_id', 'unknown')} missing field: {field}")
+            for row, col in zip(*np.nonzero(~present)):
+                policy_id = policies[row].get('policy_id', 'unknown')
+                self.errors.append(f"Policy {policy_id} missing field: {_REQUIRED_POLICY_FIELDS[col]}")
             
             # Check document quality distribution
-            quality_dist = {}
-            for policy in policies:
-                quality = policy.get('document_quality', 'unknown')
-                quality_dist[quality] = quality_dist.get(quality, 0) + 1
+            values, counts = np.unique(qualities, return_counts=True)
+            quality_dist = dict(zip(values.tolist(), (counts / max(total, 1)).tolist()))
             
             # Should have 30% clean PDF, 50% scanned, 20% handwritten
-            total = len(policies)
-            clean_pct = quality_dist.get('clean_pdf', 0) / total
-            scanned_pct = quality_dist.get('scanned_300dpi', 0) / total
-            handwritten_pct = quality_dist.get('handwritten_annotation', 0) / total
+            clean_pct = quality_dist.get('clean_pdf', 0)
+            scanned_pct = quality_dist.get('scanned_300dpi', 0)
+            handwritten_pct = quality_dist.get('handwritten_annotation', 0)
             
             if abs(clean_pct - 0.30) > 0.05:
                 self.warnings.append(f"Clean PDF distribution: expected ~30%, actual {clean_pct:.1%}")
@@ -216,7 +342,7 @@ class ResearchValidator:
         
         # Save report to file
         report = {
-            'timestamp': pd.Timestamp.now().isoformat(),
+            'timestamp': datetime.now().isoformat(),
             'errors': self.errors,
             'warnings': self.warnings,
             'status': 'PASSED' if not self.errors else 'FAILED',
@@ -224,8 +350,11 @@ class ResearchValidator:
             'total_warnings': len(self.warnings)
         }
         
-        with open(self.base_path / "validation_report.json", 'w') as f:
-            json.dump(report, f, indent=2)
+        # Unbuffered single write, synced once
+        payload = orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY)
+        with open(self.base_path / "validation_report.json", 'wb', buffering=0) as f:
+            f.write(payload)
+            getattr(os, 'fdatasync', os.fsync)(f.fileno())
         
         print(f"\n📄 Report saved to: {self.base_path / 'validation_report.json'}")
 